@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+
+import pytest
+
+from webqa_agent.testers import function_tester as ft
+from webqa_agent.testers.function_tester import (PlanFormatError, UITester,
+                                                 _truncate_page_structure)
+
+# pytest tests/test_function_tester.py -v
+
+
+class TestTruncatePageStructure:
+
+    def test_short_text_is_unchanged(self):
+        text = json.dumps(['Login', 'Search'])
+        assert _truncate_page_structure(text, 'login', max_chars=100) is text
+
+    def test_invalid_json_is_sliced(self):
+        text = 'not json ' * 100
+        assert _truncate_page_structure(text, 'login', max_chars=50) == text[:50]
+
+    def test_keeps_relevant_blocks_in_page_order(self):
+        blocks = [f'block {i} login' if i % 7 == 0 else f'block {i} other text' for i in range(200)]
+        result = json.loads(_truncate_page_structure(json.dumps(blocks), 'Login button', max_chars=300))
+        # more matching blocks exist than fit, so only matching ones are kept
+        assert result and all('login' in b for b in result)
+        positions = [blocks.index(b) for b in result]
+        assert positions == sorted(positions)
+
+    def test_result_fits_budget_with_escaped_text(self):
+        blocks = ['line "quoted"\n\\path' * 5 for _ in range(50)] + ['登录 按钮'] * 20
+        text = json.dumps(blocks, ensure_ascii=False)
+        for max_chars in (40, 200, 500, 1000):
+            result = _truncate_page_structure(text, 'quoted 登录', max_chars=max_chars)
+            assert len(result) <= max_chars
+            assert isinstance(json.loads(result), list)
+
+
+class FakeLLM:
+    model = 'fake-model'
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def get_llm_response(self, system_prompt, prompt, images=None):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+class TestGeneratePlan:
+
+    @pytest.fixture
+    def tester(self):
+        ft._LLM_RESPONSE_CACHE.clear()
+        tester = UITester({'api': 'openai', 'model': 'fake-model'})
+        yield tester
+        ft._LLM_RESPONSE_CACHE.clear()
+
+    @pytest.mark.asyncio
+    async def test_format_error_retries_with_reminder_under_base_key(self, tester):
+        plan = json.dumps({'actions': [{'type': 'Tap'}]})
+        tester.llm = FakeLLM(['not json', plan])
+        plan_json, key, text = await tester._generate_plan('system', 'base prompt', 'data:image/png;base64,AAAA')
+        assert plan_json == {'actions': [{'type': 'Tap'}]} and text == plan
+        assert tester.llm.prompts == ['base prompt', 'base prompt' + ft._STRICT_PLAN_REMINDER]
+        assert key == ft._llm_cache_key('fake-model', 'system', 'base prompt', 'data:image/png;base64,AAAA')
+
+    @pytest.mark.asyncio
+    async def test_plan_without_actions_is_a_format_error(self, tester):
+        tester.llm = FakeLLM([json.dumps({'actions': []}), json.dumps(['no', 'dict'])])
+        with pytest.raises(ValueError, match='No valid actions'):
+            await tester._generate_plan('system', 'base prompt', None)
+        assert tester.llm.prompts[1].endswith(ft._STRICT_PLAN_REMINDER)
+
+    @pytest.mark.asyncio
+    async def test_plans_are_not_cached_before_execution(self, tester):
+        tester.llm = FakeLLM([json.dumps({'actions': [{'type': 'Tap'}]})])
+        await tester._generate_plan('system', 'base prompt', None)
+        assert not ft._LLM_RESPONSE_CACHE
+
+    def test_plan_format_error_is_a_value_error(self):
+        assert issubclass(PlanFormatError, ValueError)
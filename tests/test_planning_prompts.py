@@ -0,0 +1,191 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import pathlib
+
+import pytest
+
+from webqa_agent.testers.case_gen.prompts import planning_prompts as pp
+
+# pytest tests/test_planning_prompts.py -v
+
+
+# Prompts rendered by the baseline planning_prompts.py for the inputs below
+BASELINES_PATH = pathlib.Path(__file__).parent / 'mocks' / 'prompt_baselines.json'
+
+COMPLETED_CASES = [
+    {'case_name': 'Login form validation', 'final_summary': 'Empty password rejected', 'status': 'passed'},
+    {'case_name': 'Search results', 'final_summary': 'No results page missing', 'status': 'failed',
+     'failure_type': 'recoverable'},
+]
+REFLECTION_HISTORY = [
+    {'decision': 'REPLAN', 'reasoning': 'Search flow needs coverage', 'new_plan': []},
+]
+CURRENT_PLAN = [
+    {'name': 'Login form validation', 'objective': 'Check login errors', 'test_category': 'Functional',
+     'priority': 'High', 'steps': [{'action': 'Click login'}, {'verify': 'Error is shown'}],
+     'success_criteria': ['Error message visible'], 'status': 'pending'},
+    {'name': 'Search results', 'objective': 'Search returns results', 'test_category': 'Functional',
+     'priority': 'Medium', 'steps': [{'action': 'Type query'}], 'success_criteria': ['Results listed'],
+     'status': 'pending'},
+]
+ELEMENTS = {
+    '1': {'tagName': 'button', 'innerText': 'Login', 'attributes': {'type': 'submit'}},
+    '2': {'tagName': 'input', 'innerText': '', 'attributes': {'placeholder': 'Search'}},
+}
+
+# case id -> (prompt function, arguments); every combination of planning phase,
+# objectives mode and language the graph can ask for
+RENDER_CASES = {}
+for _lang in ('zh-CN', 'en-US'):
+    for _objectives in ('', 'Verify login and search'):
+        for _replan in (False, True):
+            RENDER_CASES[f'planning_system/{_lang}/{bool(_objectives)}/{_replan}'] = (
+                'planning_system',
+                dict(business_objectives=_objectives, completed_cases=COMPLETED_CASES if _replan else None,
+                     reflection_history=REFLECTION_HISTORY, remaining_objectives='search', language=_lang),
+            )
+    RENDER_CASES[f'reflection_system/{_lang}'] = ('reflection_system', dict(language=_lang))
+    for _objectives in ('', 'Verify login and search'):
+        RENDER_CASES[f'reflection_user/{_lang}/{bool(_objectives)}'] = (
+            'reflection_user',
+            dict(business_objectives=_objectives, current_plan=CURRENT_PLAN, completed_cases=COMPLETED_CASES,
+                 page_content_summary=ELEMENTS),
+        )
+RENDER_CASES['planning_user/initial'] = ('planning_user', dict(state_url='https://example.com'))
+RENDER_CASES['planning_user/replan'] = (
+    'planning_user',
+    dict(state_url='https://example.com', completed_cases=COMPLETED_CASES,
+         reflection_history=REFLECTION_HISTORY, remaining_objectives='search'),
+)
+
+
+def render(kind: str, kwargs: dict) -> str:
+    if kind == 'planning_system':
+        return pp.get_test_case_planning_system_prompt(**kwargs)
+    if kind == 'reflection_system':
+        return pp.get_reflection_system_prompt(**kwargs)
+    if kind == 'reflection_user':
+        return pp.get_reflection_user_prompt(**kwargs)
+    # The baseline always appended the examples; replanning now leaves them out by default
+    return pp.get_test_case_planning_user_prompt(
+        page_content_summary=ELEMENTS, page_structure='', include_examples=True, **kwargs
+    )
+
+
+def _strip_whitespace(text: str) -> str:
+    return ''.join(text.split())
+
+
+class TestPromptRendering:
+    """Rendered prompts must carry the same text as the baseline templates.
+
+    Embedded JSON (schemas and runtime data) is now serialized compactly, so
+    the comparison ignores whitespace; everything else must match.
+    """
+
+    baselines = json.loads(BASELINES_PATH.read_text(encoding='utf-8'))
+
+    def test_baselines_cover_all_cases(self):
+        assert set(self.baselines) == set(RENDER_CASES)
+
+    @pytest.mark.parametrize('case_id', sorted(RENDER_CASES))
+    def test_prompt_matches_baseline(self, case_id):
+        kind, kwargs = RENDER_CASES[case_id]
+        assert _strip_whitespace(render(kind, kwargs)) == _strip_whitespace(self.baselines[case_id])
+
+    def test_cached_prompts_are_stable(self):
+        for kind, kwargs in RENDER_CASES.values():
+            assert render(kind, kwargs) == render(kind, kwargs)
+
+    def test_replan_omits_examples_by_default(self):
+        prompt = pp.get_test_case_planning_user_prompt(
+            'https://example.com', ELEMENTS, '', COMPLETED_CASES, REFLECTION_HISTORY, 'search'
+        )
+        assert 'Example 1:' not in prompt
+        assert 'Example 1:' in render(*RENDER_CASES['planning_user/initial'])
+
+
+class TestSerializationCaches:
+    """The id()-keyed JSON caches must never return stale fragments."""
+
+    def test_current_plan_matches_plain_dumps(self):
+        plan = [dict(case, completed_steps=[{'step': 1}], test_context={'k': 'v'}) for case in CURRENT_PLAN]
+        expected = pp._dumps([pp._project_plan_case(case) for case in plan])
+        assert pp._dumps_current_plan(plan) == expected
+        assert 'completed_steps' not in expected and 'test_context' not in expected
+        assert '"steps"' in expected and '"success_criteria"' in expected
+
+    def test_status_change_invalidates_plan_cache(self):
+        plan = [dict(case) for case in CURRENT_PLAN]
+        first = pp._dumps_current_plan(plan)
+        plan[0]['status'] = 'completed'
+        second = pp._dumps_current_plan(plan)
+        assert second != first
+        assert json.loads(second)[0]['status'] == 'completed'
+
+    def test_in_place_step_change_invalidates_plan_cache(self):
+        plan = [json.loads(json.dumps(case)) for case in CURRENT_PLAN]
+        pp._dumps_current_plan(plan)
+        plan[1]['steps'].append({'verify': 'Results shown'})
+        assert json.loads(pp._dumps_current_plan(plan))[1]['steps'][-1] == {'verify': 'Results shown'}
+
+    def test_recycled_id_does_not_reuse_fragment(self):
+        record = {'case_name': 'a', 'status': 'passed'}
+        pp._dumps_recorded(record)
+        key = id(record)
+        del record
+        other = {'case_name': 'b', 'status': 'failed'}
+        # Simulate the allocator handing the old id to a new object
+        cached = pp._CASE_JSON_CACHE.pop(key)
+        pp._CASE_JSON_CACHE[id(other)] = cached
+        assert pp._dumps_recorded(other) == pp._dumps(other)
+
+    def test_completed_cases_match_plain_dumps(self):
+        cases = [dict(case) for case in COMPLETED_CASES]
+        assert pp._dumps_completed_cases(cases) == pp._dumps(cases)
+        cases.append({'case_name': 'c', 'status': 'passed'})
+        assert pp._dumps_completed_cases(cases) == pp._dumps(cases)
+
+
+class TestCompactElements:
+
+    def test_keeps_only_id_tag_and_short_text(self):
+        summary = {
+            '1': {'tagName': 'a', 'innerText': '  Home \n\t page ', 'attributes': {'href': '/'},
+                  'center_x': 10, 'center_y': 20},
+            '2': {'tagName': 'div', 'innerText': '', 'attributes': {}},
+            '3': 'raw',
+        }
+        assert pp._compact_elements(summary) == {
+            '1': {'tagName': 'a', 'innerText': ' Home page '},
+            '2': {'tagName': 'div'},
+            '3': 'raw',
+        }
+
+    def test_keeps_every_element_and_truncates_text(self):
+        summary = {str(i): {'tagName': 'p', 'innerText': 'x' * 500} for i in range(200)}
+        compact = pp._compact_elements(summary)
+        assert list(compact) == list(summary)
+        assert all(len(e['innerText']) == pp.MAX_ELEMENT_TEXT_LENGTH for e in compact.values())
+
+    def test_oversized_map_keeps_all_ids_in_reflection_prompt(self):
+        count = pp.MAX_PROMPT_ELEMENTS + 20
+        summary = {
+            str(i): {'tagName': 'button', 'innerText': f'Action {i}', 'attributes': {'data-long': 'y' * 200}}
+            for i in range(count)
+        }
+        prompt = pp.get_reflection_user_prompt('', CURRENT_PLAN, COMPLETED_CASES, summary)
+        start = prompt.index('- **Interactive Elements Map**:\n') + len('- **Interactive Elements Map**:\n')
+        embedded = json.loads(prompt[start:prompt.index('\n- **Visual Element Reference**')])
+        assert list(embedded) == list(summary)
+        assert embedded[str(count - 1)] == {'tagName': 'button', 'innerText': f'Action {count - 1}'}
+        assert 'data-long' not in prompt
+
+    def test_small_map_is_embedded_unchanged(self):
+        prompt = pp.get_reflection_user_prompt('', CURRENT_PLAN, COMPLETED_CASES, ELEMENTS)
+        assert pp._dumps(ELEMENTS) in prompt
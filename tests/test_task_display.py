@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+import re
+
+import pytest
+
+from webqa_agent.utils.get_log import COLORS, ColoredFormatter
+from webqa_agent.utils.task_display_util import _format_log_line
+
+# pytest tests/test_task_display.py -v
+
+DEBUG_FMT = '%(asctime)s %(levelname)s [%(name)s] [%(filename)s (%(funcName)s:%(lineno)d)] - %(message)s'
+INFO_FMT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_ANSI = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+_LOG_LINE = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+)(\s+)(\w+)(\s+\[.*?]\s+\[.*?]\s+-\s+)(.*)')
+
+
+def legacy_format(line: str, col: int) -> str:
+    """The per-line logic of _Display._render_frame before it was replaced
+    by _format_log_line."""
+    _line = _ANSI.sub('', str(line))
+    if len(_line) >= col:
+        match = _LOG_LINE.search(_line[:col - 3])
+        if match:
+            timestamp, space1, loglevel, middle, message = match.groups()
+            color = COLORS[loglevel]
+            end = COLORS['ENDC']
+            return f'{timestamp}{space1}{color}{loglevel}{end}{middle}{color}{message}{end}...'
+        return f'{_line[:col - 3]}...'
+    return line
+
+
+def render_record(fmt: str, level: int, message: str) -> str:
+    record = logging.LogRecord('root', level, '/src/module.py', 42, message, None, None, func='run')
+    return ColoredFormatter(fmt).format(record)
+
+
+MESSAGES = [
+    'short',
+    'x' * 300,
+    'Clicking element [12] with text "Login"',
+    'message with \x1b[31mred\x1b[0m inside ' * 10,
+    '中文日志消息，包含宽字符' * 20,
+]
+
+
+class TestFormatLogLine:
+
+    @pytest.mark.parametrize('fmt', [DEBUG_FMT, INFO_FMT])
+    @pytest.mark.parametrize('level', [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR])
+    @pytest.mark.parametrize('message', MESSAGES)
+    def test_matches_legacy_render(self, fmt, level, message):
+        line = render_record(fmt, level, message)
+        for col in (20, 60, 80, 120, 180, 400):
+            assert _format_log_line(line, col) == legacy_format(line, col)
+
+    @pytest.mark.parametrize('line', ['', 'plain text without timestamp', 'plain ' * 100, '\x1b[1;32mcolored\x1b[0m' * 30])
+    def test_non_log_lines_match_legacy_render(self, line):
+        for col in (20, 80, 180):
+            assert _format_log_line(line, col) == legacy_format(line, col)
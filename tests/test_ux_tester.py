@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import base64
+import json
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from webqa_agent.data.test_structures import SubTestResult
+from webqa_agent.testers.ux_tester import (PageContentTest, PageTextTest,
+                                          _compress_screenshot)
+
+# pytest tests/test_ux_tester.py -v
+
+
+def _png_data_url(width: int, height: int) -> str:
+    out = BytesIO()
+    Image.new('RGB', (width, height), (255, 255, 255)).save(out, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(out.getvalue()).decode('utf-8')
+
+
+def _decode(data_url: str) -> Image.Image:
+    return Image.open(BytesIO(base64.b64decode(data_url.split(',', 1)[1])))
+
+
+class FakeLLM:
+    model = 'fake-model'
+
+    def __init__(self, response):
+        self.response = response
+        self.images = None
+
+    async def get_llm_response(self, system_prompt, prompt, images=None):
+        self.images = images
+        return self.response
+
+
+class TestCompressScreenshot:
+
+    def test_shrinks_to_max_edge(self):
+        shot, scale = _compress_screenshot(_png_data_url(2000, 1000), max_edge=1000)
+        assert shot.startswith('data:image/jpeg;base64,')
+        assert scale == 0.5
+        assert _decode(shot).size == (1000, 500)
+
+    def test_small_image_keeps_scale(self):
+        _, scale = _compress_screenshot(_png_data_url(800, 600), max_edge=1000)
+        assert scale == 1.0
+
+    def test_non_data_url_is_unchanged(self):
+        assert _compress_screenshot('https://example.com/a.png', max_edge=100) == ('https://example.com/a.png', 1.0)
+
+
+class TestCoordinateRescaling:
+
+    @pytest.mark.asyncio
+    async def test_coordinates_map_back_to_original_screenshot(self):
+        original = [_png_data_url(1600, 1200), _png_data_url(1600, 1200)]
+        compressed = [_compress_screenshot(shot, max_edge=800) for shot in original]
+        llm_screenshot = [shot for shot, _ in compressed]
+        scales = [scale for _, scale in compressed]
+
+        # The model reports coordinates in the space of the image it was sent
+        issues = [{'issue': 'Overlapping text', 'screenshotid': 1, 'coordinates': [100, 50, 300, 150],
+                   'suggestion': 'Fix spacing'}]
+        tester = PageContentTest({'screenshot_max_edge': 800})
+        tester.llm = FakeLLM(json.dumps(issues))
+        result = SubTestResult(name='layout')
+
+        await tester._run_single_test(result, 'Layout check', {}, original, True,
+                                      llm_screenshot=llm_screenshot, screenshot_scales=scales)
+
+        assert tester.llm.images == llm_screenshot
+        reported = json.loads(result.report[0].issues)
+        assert reported[0]['coordinates'] == [200, 100, 600, 300]
+
+        # The box is drawn on the full-size screenshot at the rescaled position
+        annotated = _decode(result.steps[0].screenshots[0].data).convert('RGB')
+        assert annotated.size == (1600, 1200)
+        assert annotated.getpixel((200, 200)) == (255, 0, 0)
+        assert annotated.getpixel((100, 50)) == (255, 255, 255)
+
+
+class TestFormatIssuesToMarkdown:
+
+    @pytest.fixture
+    def tester(self):
+        return PageTextTest({}, report_config={'language': 'en-US'})
+
+    def test_formats_json_issues(self, tester):
+        content = json.dumps({'error': [{'location': 'Header', 'current': 'Teh', 'suggested': 'The',
+                                         'type': 'Typo'}], 'reason': 'Spelling'})
+        markdown = tester.format_issues_to_markdown(content)
+        assert 'Header' in markdown and '`Teh`' in markdown and '`The`' in markdown
+
+    def test_invalid_json_is_returned_unchanged(self, tester):
+        content = '{"error": [unterminated'
+        assert tester.format_issues_to_markdown(content) == content
@@ -174,6 +174,10 @@ def validate_and_build_llm_config(cfg):
     }
     if top_p is not None:
         llm_config["top_p"] = top_p
+    if llm_cfg_raw.get("compact_error_prompt"):
+        llm_config["compact_error_prompt"] = True
+    if llm_cfg_raw.get("screenshot_max_edge"):
+        llm_config["screenshot_max_edge"] = int(llm_cfg_raw["screenshot_max_edge"])
 
     # Show configuration source (hide sensitive information)
     api_key_masked = f"{api_key[:8]}...{api_key[-4:]}" if len(api_key) > 12 else "***"
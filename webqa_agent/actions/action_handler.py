@@ -553,8 +553,8 @@ class ActionHandler:
         # get screenshot
         screenshot_bytes = await self.take_screenshot(self.page, full_page=full_page, timeout=30000)
 
-        # convert to Base64
-        screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
+        # convert to Base64 off the event loop; multi-MB full-page captures would otherwise stall other coroutines
+        screenshot_base64 = (await asyncio.to_thread(base64.b64encode, screenshot_bytes)).decode('utf-8')
         base64_data = f'data:image/png;base64,{screenshot_base64}'
         return base64_data
 
@@ -12,6 +12,7 @@ from webqa_agent.crawler.dom_cacher import DomCacher
 from typing import List, Dict, Optional, Any, Tuple, TypedDict, Union, Iterable
 from pydantic import BaseModel, Field
 from enum import Enum
+from functools import lru_cache
 from itertools import groupby
 
 
@@ -449,9 +450,13 @@ class DeepCrawler:
     # ------------------------------------------------------------------------
 
     @staticmethod
+    @lru_cache(maxsize=8)
     def read_js(file_path: Path) -> str:
         """
         Read and return the content of a JavaScript file.
+
+        The bundled scripts are static, so each file is read from disk once
+        and shared by every crawler instance.
         
         Args:
             file_path: Path to the JavaScript file.
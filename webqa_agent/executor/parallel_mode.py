@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional, Tuple, Coroutine
 from webqa_agent.browser.config import DEFAULT_CONFIG
 from webqa_agent.data import ParallelTestSession, TestConfiguration, TestType, get_default_test_name
 from webqa_agent.executor import ParallelTestExecutor
+from webqa_agent.llm.llm_api import LLMAPIRegistry
 from webqa_agent.utils import Display
 from webqa_agent.utils.get_log import GetLog
 from webqa_agent.utils.log_icon import icon
@@ -64,7 +65,11 @@ class ParallelMode:
                 self._configure_tests_from_config(test_session, test_configurations, browser_config, report_cfg)
 
             # Execute tests in parallel
-            completed_session = await self.executor.execute_parallel_tests(test_session)
+            try:
+                completed_session = await self.executor.execute_parallel_tests(test_session)
+            finally:
+                # Release the LLM clients shared by the testers even if the run failed
+                await LLMAPIRegistry.close_all()
 
             result = completed_session.aggregated_results.get("count", {})
             
@@ -1,7 +1,9 @@
+import asyncio
+import json
 import logging
 
 import httpx
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 
 class LLMAPI:
@@ -18,9 +20,11 @@ class LLMAPI:
             if not self.api_key:
                 raise ValueError("API key is empty. OpenAI client not initialized.")
             self.base_url = self.llm_config.get("base_url")
-            # Use AsyncOpenAI client for async operations
-            self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, timeout=60) if self.base_url else AsyncOpenAI(
-                api_key=self.api_key, timeout=60)
+            # Use AsyncOpenAI client for async operations, on a shared keep-alive connection pool
+            http_client = await self._get_client()
+            self.client = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, timeout=60, http_client=http_client
+            ) if self.base_url else AsyncOpenAI(api_key=self.api_key, timeout=60, http_client=http_client)
             logging.debug(f"AsyncOpenAI client initialized with API key: {self.api_key}, Model: {self.model} and base URL: {self.base_url}")
         else:
             raise ValueError("Invalid API type or missing credentials. LLM client not initialized.")
@@ -29,7 +33,10 @@ class LLMAPI:
 
     async def _get_client(self):
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=60.0)
+            # Keep the SDK's client defaults (redirects, timeouts); only the pool size differs
+            self._client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
         return self._client
 
     async def get_llm_response(self, system_prompt, prompt, images=None, temperature=None, top_p=None):
@@ -133,3 +140,43 @@ class LLMAPI:
         if self._client:
             await self._client.aclose()
             self._client = None
+            self.client = None
+
+
+class LLMAPIRegistry:
+    """Shares one initialized LLMAPI per llm_config within an event loop.
+
+    Testers that run against the same model reuse a single client and its
+    keep-alive connection pool instead of each opening their own. Clients
+    are bound to the loop they were created on, so entries are keyed by the
+    running loop as well and dropped once that loop is closed.
+    """
+
+    _clients: dict = {}
+
+    @classmethod
+    async def get(cls, llm_config: dict) -> LLMAPI:
+        loop = asyncio.get_running_loop()
+        for key in [k for k, (lp, _) in cls._clients.items() if lp.is_closed()]:
+            del cls._clients[key]
+
+        key = (id(loop), json.dumps(llm_config, sort_keys=True, default=str))
+        entry = cls._clients.get(key)
+        if entry is not None:
+            return entry[1]
+
+        llm = LLMAPI(llm_config)
+        await llm.initialize()
+        entry = cls._clients.setdefault(key, (loop, llm))
+        if entry[1] is not llm:
+            # another task registered a client for this config meanwhile
+            await llm.close()
+        return entry[1]
+
+    @classmethod
+    async def close_all(cls):
+        """Close the shared clients created on the running loop."""
+        loop = asyncio.get_running_loop()
+        for key in [k for k, (lp, _) in cls._clients.items() if lp is loop]:
+            _, llm = cls._clients.pop(key)
+            await llm.close()
@@ -135,7 +135,7 @@ async def plan_test_cases(state: MainGraphState) -> Dict[str, List[Dict[str, Any
     logging.debug(f"LLM planning request completed in {duration:.2f} seconds")
 
     try:
-        # Extract only the JSON part of the response, ignoring the scratchpad
+        # Extract only the JSON part of the response, ignoring any surrounding text
         json_part_match = re.search(r"```json\s*([\s\S]*?)\s*```", response)
         if not json_part_match:
             # Fallback for responses that might not have the json markdown
@@ -308,9 +308,6 @@ async def reflect_and_replan(state: MainGraphState) -> dict:
     logging.debug(f"current page crawled result: {page_content_summary}")
     screenshot = await ui_tester._actions.b64_page_screenshot(file_name="reflection", save_to_log=False, full_page=False)
     await dp.remove_marker()
-    await dp.crawl(highlight=False, highlight_text=True, viewport_only=True)
-    page_structure = dp.get_text()
-    logging.debug(f"----- reflection ---- Page structure: {page_structure}")
 
     logging.debug(f"Reflection analysis enhanced with {len(page_content_summary)} interactive elements")
 
@@ -320,7 +317,6 @@ async def reflect_and_replan(state: MainGraphState) -> dict:
         business_objectives=state.get("business_objectives"),
         current_plan=state["test_cases"],
         completed_cases=state["completed_cases"],
-        page_structure=page_structure,
         page_content_summary=page_content_summary,
         language=language,
     )
@@ -1,24 +1,93 @@
 """Prompt templates for test planning and case generation."""
 
+from __future__ import annotations
+
+import copy
 import json
+import logging
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from typing import Iterator
 
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except Exception:
+    _ORJSON_AVAILABLE = False
 
-def get_shared_test_design_standards(language: str = 'zh-CN') -> str:
-    """Get shared test case design standards for reuse in plan and reflect modules.
+# Interactive element maps larger than this are embedded in compact form (id, tag
+# and short text per element) so that every element still reaches the prompt
+MAX_PROMPT_ELEMENTS = 80
+MAX_ELEMENT_TEXT_LENGTH = 50
 
-    Args:
-        language: Language for test case naming (zh-CN or en-US)
+_WHITESPACE_RE = re.compile(r"\s+")
 
-    Returns:
-        String containing complete test case design standards
+
+def _dumps(obj) -> str:
+    """Serialize prompt payloads as compact JSON; the LLM does not need
+    indentation.
+
+    Uses orjson when it is installed and falls back to the stdlib encoder
+    otherwise (or for payloads orjson rejects); both emit equivalent JSON.
     """
-    name_language = '中文' if language == 'zh-CN' else 'English'
-    return f"""## Enhanced Test Case Design Standards
+    if _ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+# Serialized completed cases and reflections keyed by id(); the object is kept
+# alongside so a recycled id never returns another object's JSON
+_CASE_JSON_CACHE: OrderedDict[int, tuple[dict, str]] = OrderedDict()
+_CASE_JSON_CACHE_SIZE = 512
+
+
+def _dumps_recorded(record: dict) -> str:
+    """Serialize a completed case or reflection result, reusing its JSON from
+    earlier planning or reflection rounds.
+
+    These records are not modified once appended to the graph state, so each
+    one is encoded only once. The output is identical to ``_dumps``.
+    """
+    cached = _CASE_JSON_CACHE.get(id(record))
+    if cached is not None and cached[0] is record:
+        _CASE_JSON_CACHE.move_to_end(id(record))
+        return cached[1]
+    fragment = _dumps(record)
+    _CASE_JSON_CACHE[id(record)] = (record, fragment)
+    if len(_CASE_JSON_CACHE) > _CASE_JSON_CACHE_SIZE:
+        _CASE_JSON_CACHE.popitem(last=False)
+    return fragment
+
+
+def _dumps_completed_cases(completed_cases: list) -> str:
+    """Serialize completed cases; only newly appended cases are encoded."""
+    return "[" + ",".join([_dumps_recorded(case) for case in completed_cases]) + "]"
+
+
+def _normalize_objectives(business_objectives) -> str:
+    """Normalize business objectives given as a string, a list of strings or
+    None into a single string; list items are joined with ``"; "``."""
+    if not business_objectives:
+        return ""
+    if isinstance(business_objectives, str):
+        return business_objectives
+    if isinstance(business_objectives, (list, tuple)):
+        return "; ".join(str(objective) for objective in business_objectives)
+    return str(business_objectives)
+
+
+# Shared test case design standards, rendered once per test case naming language
+_SHARED_TEST_DESIGN_STANDARDS_TEMPLATE = Template("""## Enhanced Test Case Design Standards
 
 ### Domain-Aware Test Case Structure Requirements
 Each test case must include these standardized components with enhanced business context:
 
-- **`name`**: 简洁直观的测试名称，反映业务场景和测试目的 (使用{name_language}命名)
+- **`name`**: 简洁直观的测试名称，反映业务场景和测试目的 (使用${name_language}命名)
 - **`objective`**: Clear statement linking the test to specific business requirements and domain context
 - **`test_category`**: Enhanced classification including domain-specific categories (Ecommerce_Functional, Banking_Security, Healthcare_Compliance, etc.)
 - **`priority`**: Test priority level based on comprehensive impact assessment (Critical, High, Medium, Low):
@@ -50,21 +119,21 @@ Each test case must include these standardized components with enhanced business
 **✅ Atomic Action Design (Preferred)**:
 ```json
 [
-{{"action": "Click navigation bar A"}},
-{{"verify": "Confirm navigation to page A"}},
-{{"action": "Click navigation bar B"}},
-{{"verify": "Confirm navigation to page B"}},
-{{"action": "Click navigation bar C"}},
-{{"verify": "Confirm navigation to page C"}}
+{"action": "Click navigation bar A"},
+{"verify": "Confirm navigation to page A"},
+{"action": "Click navigation bar B"},
+{"verify": "Confirm navigation to page B"},
+{"action": "Click navigation bar C"},
+{"verify": "Confirm navigation to page C"}
 ]
 ```
 
 **Search Testing - Atomic Steps**:
 ```json
 [
-{{"action": "Enter search keyword 'product' in the input field"}},
-{{"action": "Click the search button"}},
-{{"verify": "Confirm search results list is displayed"}}
+{"action": "Enter search keyword 'product' in the input field"},
+{"action": "Click the search button"},
+{"verify": "Confirm search results list is displayed"}
 ]
 ```
 
@@ -118,26 +187,26 @@ Each test case must include these standardized components with enhanced business
 
 **❌ Technical Action Step (Avoid)**:
 ```json
-{{"action": "Enter valid email address 'testuser@example.com' in the email field"}}
+{"action": "Enter valid email address 'testuser@example.com' in the email field"}
 ```
 
 **✅ User-Scenario Action Step (Preferred)**:
 ```json
-{{"action": "Type your email address in the signup form like you normally would"}}
+{"action": "Type your email address in the signup form like you normally would"}
 ```
 
 **❌ Technical Verify Step (Avoid)**:
 ```json
-{{"verify": "Record any exceptions, stack traces, or network request failures in browser console (screenshot and save logs)"}},
-{{"verify": "Check DOM element CSS properties and JavaScript event bindings"}},
-{{"verify": "Verify HTTP response status code is 200 and check response headers"}}
+{"verify": "Record any exceptions, stack traces, or network request failures in browser console (screenshot and save logs)"},
+{"verify": "Check DOM element CSS properties and JavaScript event bindings"},
+{"verify": "Verify HTTP response status code is 200 and check response headers"}
 ```
 
 **✅ User-Scenario Verify Step (Preferred)**:
 ```json
-{{"verify": "Confirm page displays 'Login successful' message"}},
-{{"verify": "Check if redirected to user homepage"}},
-{{"verify": "Confirm form displays error message 'Please enter a valid email'"}}
+{"verify": "Confirm page displays 'Login successful' message"},
+{"verify": "Check if redirected to user homepage"},
+{"verify": "Confirm form displays error message 'Please enter a valid email'"}
 ```
 
 #### Verification Design Principles
@@ -170,83 +239,78 @@ Each test case must include these standardized components with enhanced business
 - **Minimize Navigation**: Prefer testing multiple features on the same page before navigating away
 - **Logical Flow**: Follow realistic user navigation patterns and business workflows
 - **State Preservation**: Consider page state changes and user context throughout navigation
-- **Business Journey**: Align navigation with typical business user journeys and workflows"""
+- **Business Journey**: Align navigation with typical business user journeys and workflows""")
 
+_SHARED_TEST_DESIGN_STANDARDS = {
+    name_language: _SHARED_TEST_DESIGN_STANDARDS_TEMPLATE.substitute(name_language=name_language)
+    for name_language in ('中文', 'English')
+}
 
-def get_test_case_planning_system_prompt(
-    business_objectives: str,
-    completed_cases: list = None,
-    reflection_history: list = None,
-    remaining_objectives: str = None,
-    language: str = 'zh-CN',
-) -> str:
-    """Generate system prompt for test case planning.
+
+def get_shared_test_design_standards(language: str = 'zh-CN') -> str:
+    """Get shared test case design standards for reuse in plan and reflect modules.
 
     Args:
-        business_objectives: Business objectives
-        completed_cases: Completed test cases (for replanning)
         language: Language for test case naming (zh-CN or en-US)
-        reflection_history: Reflection history (for replanning)
-        remaining_objectives: Remaining objectives (for replanning)
 
     Returns:
-        Formatted system prompt string
+        String containing complete test case design standards
     """
+    name_language = '中文' if language == 'zh-CN' else 'English'
+    return _SHARED_TEST_DESIGN_STANDARDS[name_language]
 
-    # Determine if initial planning or replanning
-    if not completed_cases:
-        # Decide mode based on whether business_objectives is empty
-        # Handle case where business_objectives might be a list
-        business_objectives_str = business_objectives if isinstance(business_objectives, str) else str(business_objectives) if business_objectives else ""
-        if business_objectives_str and business_objectives_str.strip():
-            role_and_objective = """
+
+# Role and mode sections of the planning system prompt; the intent-driven
+# mode sections are templates filled with the business objectives
+_PLANNING_ROLE_INTENT = """
 ## Role
 You are a Senior QA Testing Professional with expertise in business domain analysis, requirement engineering, and context-aware test design. Your responsibility is to deeply understand the application's business context, domain-specific patterns, and user needs to generate highly relevant and effective test cases.
 
 ## Primary Objective
 Conduct comprehensive business domain analysis and contextual understanding before generating test cases. Analyze the application's purpose, industry patterns, user workflows, and business logic to create test cases that are not only technically sound but also business-relevant and domain-appropriate.
 """
-            mode_section = f"""
-## Test Planning Mode: Context-Aware Intent-Driven Testing
-**Business Objectives Provided**: {business_objectives_str}
 
+_PLANNING_ROLE_COMPREHENSIVE = """
+## Role
+You are a Senior QA Testing Professional with expertise in comprehensive web application analysis and domain-aware testing. Your responsibility is to conduct deep application analysis, understand business context, and design complete test suites that ensure software quality through systematic validation of all functional, business, and domain-specific requirements.
+
+## Primary Objective
+Perform comprehensive application analysis including business domain understanding, user workflow identification, and contextual awareness before generating test cases. Apply established QA methodologies including domain-specific testing patterns, business process validation, and risk-based testing prioritization.
+"""
+
+_PLANNING_ROLE_REPLAN = """
+## Role
+You are a Senior QA Testing Professional performing adaptive test plan revision based on execution results, enhanced business understanding, and evolving domain context.
+
+## Primary Objective
+Leverage deeper business domain insights and execution learnings to generate refined test plans that address remaining coverage gaps while building upon successful outcomes. Ensure enhanced business relevance and domain appropriateness in all test cases.
+"""
+
+# Analysis steps shared by both initial planning mode sections
+_PLANNING_ANALYSIS_INTRO = """
 === Enhanced Analysis Requirements ===
 Please follow these steps for comprehensive page analysis:
 
 ### Phase 1: Business Domain & Context Analysis
-1. **Domain Identification and Business Context**:
-   - Identify the specific industry (e.g., e-commerce, finance, healthcare, education, media)
-   - Analyze business model and revenue streams (if discernible)
-   - Map different user types (customers, administrators, partners, etc.) and their needs
-   - Recognize applicable regulations and compliance requirements
-
-2. **Application Purpose and Value Analysis**:
-   - Determine primary application purpose (informational, transactional, social, utility, etc.)
-   - Identify key user journeys and critical workflows
-   - Understand the value proposition and core functionalities
-   - Recognize competitive differentiators and unique features
+"""
 
-### Phase 2: Functional & Technical Analysis
+_PLANNING_FUNCTIONAL_MODULE_ANALYSIS = """### Phase 2: Functional & Technical Analysis
 3. **Functional Module Identification**:
    - Identify main functional areas of the page (navigation bar, login area, search box, forms, buttons, etc.)
    - Analyze interactive elements (input fields, dropdown menus, buttons, links, etc.)
    - Identify business processes (login, registration, search, form submission, etc.)
    - Map UI components to underlying business processes and rules
 
-4. **User Journey & Workflow Analysis**:
-   - Analyze possible user operation paths
-   - Identify key business scenarios and user workflows
-   - Consider exception cases and boundary conditions
-   - Account for different user types and permission levels
+"""
 
-### Phase 3: Strategic Test Planning
+_PLANNING_PRIORITY_ASSESSMENT = """### Phase 3: Strategic Test Planning
 5. **Test Priority Assessment**:
    - Core functionality > auxiliary functionality
    - High-frequency usage scenarios > low-frequency scenarios
    - Business-critical paths > general functionality
-   - Revenue impact and user experience considerations
+"""
 
-6. **Risk Assessment & Prioritization**:
+_PLANNING_RISK_ASSESSMENT_AND_GUIDELINES = """6. **Risk Assessment & Prioritization**:
    - Business Risk Analysis: Identify impact of failures on business operations and revenue
    - User Experience Impact: Prioritize user-facing functionality and usability
    - Technical Complexity: Evaluate implementation complexity and associated risks
@@ -263,23 +327,48 @@ For each test case, provide:
 - **Success criteria**: Clear verification conditions
 - **Test data**: If data input is required, provide specific test data
 """
-        else:
-            role_and_objective = """
-## Role
-You are a Senior QA Testing Professional with expertise in comprehensive web application analysis and domain-aware testing. Your responsibility is to conduct deep application analysis, understand business context, and design complete test suites that ensure software quality through systematic validation of all functional, business, and domain-specific requirements.
 
-## Primary Objective
-Perform comprehensive application analysis including business domain understanding, user workflow identification, and contextual awareness before generating test cases. Apply established QA methodologies including domain-specific testing patterns, business process validation, and risk-based testing prioritization.
+_PLANNING_MODE_INTENT_TEMPLATE = Template(
+    """
+## Test Planning Mode: Context-Aware Intent-Driven Testing
+**Business Objectives Provided**: ${business_objectives}
 """
-            mode_section = """
-## Test Planning Mode: Comprehensive Context-Aware Testing
-**Business Objectives**: Not provided - Performing comprehensive testing with domain analysis
+    + _PLANNING_ANALYSIS_INTRO
+    + """1. **Domain Identification and Business Context**:
+   - Identify the specific industry (e.g., e-commerce, finance, healthcare, education, media)
+   - Analyze business model and revenue streams (if discernible)
+   - Map different user types (customers, administrators, partners, etc.) and their needs
+   - Recognize applicable regulations and compliance requirements
 
-=== Enhanced Analysis Requirements ===
-Please follow these steps for comprehensive page analysis:
+2. **Application Purpose and Value Analysis**:
+   - Determine primary application purpose (informational, transactional, social, utility, etc.)
+   - Identify key user journeys and critical workflows
+   - Understand the value proposition and core functionalities
+   - Recognize competitive differentiators and unique features
 
-### Phase 1: Business Domain & Context Analysis
-1. **Domain Discovery and Analysis**:
+"""
+    + _PLANNING_FUNCTIONAL_MODULE_ANALYSIS
+    + """4. **User Journey & Workflow Analysis**:
+   - Analyze possible user operation paths
+   - Identify key business scenarios and user workflows
+   - Consider exception cases and boundary conditions
+   - Account for different user types and permission levels
+
+"""
+    + _PLANNING_PRIORITY_ASSESSMENT
+    + """   - Revenue impact and user experience considerations
+
+"""
+    + _PLANNING_RISK_ASSESSMENT_AND_GUIDELINES
+)
+
+_PLANNING_MODE_COMPREHENSIVE = (
+    """
+## Test Planning Mode: Comprehensive Context-Aware Testing
+**Business Objectives**: Not provided - Performing comprehensive testing with domain analysis
+"""
+    + _PLANNING_ANALYSIS_INTRO
+    + """1. **Domain Discovery and Analysis**:
    - Identify application domain and industry vertical from content and functionality
    - Analyze business logic and operational patterns
    - Understand user roles and their specific interaction patterns
@@ -291,59 +380,25 @@ Please follow these steps for comprehensive page analysis:
    - Understand data flow and business rule validation
    - Recognize integration points and external dependencies
 
-### Phase 2: Functional & Technical Analysis
-3. **Functional Module Identification**:
-   - Identify main functional areas of the page (navigation bar, login area, search box, forms, buttons, etc.)
-   - Analyze interactive elements (input fields, dropdown menus, buttons, links, etc.)
-   - Identify business processes (login, registration, search, form submission, etc.)
-   - Map UI components to underlying business processes and rules
-
-4. **User Experience Context**:
+"""
+    + _PLANNING_FUNCTIONAL_MODULE_ANALYSIS
+    + """4. **User Experience Context**:
    - Analyze user journey patterns and usage scenarios
    - Identify pain points and usability requirements
    - Understand accessibility and inclusivity needs
    - Recognize performance and reliability expectations
 
-### Phase 3: Strategic Test Planning
-5. **Test Priority Assessment**:
-   - Core functionality > auxiliary functionality
-   - High-frequency usage scenarios > low-frequency scenarios
-   - Business-critical paths > general functionality
-   - User impact and business value considerations
-
-6. **Risk Assessment & Prioritization**:
-   - Business Risk Analysis: Identify impact of failures on business operations and revenue
-   - User Experience Impact: Prioritize user-facing functionality and usability
-   - Technical Complexity: Evaluate implementation complexity and associated risks
-   - Compliance and Security: Assess regulatory requirements and security implications
-
-=== Test Case Generation Guidelines ===
-For each test case, provide:
-- **Clear test objectives**: Describe what functionality to verify
-- **Detailed test steps**: Specific operation sequences, including:
-  * Page navigation
-  * Element location and interaction
-  * Data input
-  * Verification points
-- **Success criteria**: Clear verification conditions
-- **Test data**: If data input is required, provide specific test data
 """
-    else:
-        # Replanning mode
-        role_and_objective = """
-## Role
-You are a Senior QA Testing Professional performing adaptive test plan revision based on execution results, enhanced business understanding, and evolving domain context.
+    + _PLANNING_PRIORITY_ASSESSMENT
+    + """   - User impact and business value considerations
 
-## Primary Objective
-Leverage deeper business domain insights and execution learnings to generate refined test plans that address remaining coverage gaps while building upon successful outcomes. Ensure enhanced business relevance and domain appropriateness in all test cases.
 """
-        # Also decide mode based on business_objectives during replanning
-        # Handle case where business_objectives might be a list
-        business_objectives_str = business_objectives if isinstance(business_objectives, str) else str(business_objectives) if business_objectives else ""
-        if business_objectives_str and business_objectives_str.strip():
-            mode_section = f"""
+    + _PLANNING_RISK_ASSESSMENT_AND_GUIDELINES
+)
+
+_PLANNING_MODE_REPLAN_INTENT_TEMPLATE = Template("""
 ## Replanning Mode: Enhanced Context-Aware Revision
-**Original Business Objectives**: {business_objectives_str}
+**Original Business Objectives**: ${business_objectives}
 
 ### Enhanced Replanning Requirements
 - Apply deeper domain understanding gained from execution results
@@ -351,9 +406,9 @@ Leverage deeper business domain insights and execution learnings to generate ref
 - Maintain focus on original business objectives while improving domain appropriateness
 - Incorporate lessons learned from executed test cases
 - Ensure new test cases complement completed ones with superior business alignment
-"""
-        else:
-            mode_section = """
+""")
+
+_PLANNING_MODE_REPLAN_COMPREHENSIVE = """
 ## Replanning Mode: Enhanced Comprehensive Testing Revision
 **Original Objectives**: Comprehensive testing with enhanced domain awareness
 
@@ -386,54 +441,92 @@ Leverage deeper business domain insights and execution learnings to generate ref
  3. The most valuable next action
 """
 
-    shared_standards = get_shared_test_design_standards(language)
 
-    system_prompt = f"""
-{role_and_objective}
-
-{mode_section}
-
-{shared_standards}
+# Output format section closing the planning system prompt
+_PLANNING_OUTPUT_FORMAT_BLOCK = """
 
 ## Output Format Requirements
 
 Your response must be ONLY in JSON format. Do not include any analysis, explanation, or additional text outside the JSON structure.
 
 ```json
-[
-  {{
-    "name": "descriptive_test_identifier",
-    "objective": "clear_test_purpose_with_business_context",
-    "test_category": "enhanced_category_classification",
-    "priority": "priority_level",
-    "business_context": "Generic test scenario validating core functionality and user requirements",
-    "functional_criticality": "Context-dependent importance based on business impact and user needs",
-    "domain_specific_rules": "industry_specific_validation_requirements",
-    "test_data_requirements": "domain_appropriate_data_requirements",
-    "preamble_actions": [optional_setup_steps],
-    "steps": [
-      {{"action": "specific_action_instruction"}},
-      {{"verify": "precise_validation_instruction"}}
-    ],
-    "reset_session": boolean_isolation_flag,
-    "success_criteria": ["measurable_success_conditions"],
-    "cleanup_requirements": "optional_cleanup_specifications"
-  }}
-]
+[{"name":"descriptive_test_identifier","objective":"clear_test_purpose_with_business_context","test_category":"enhanced_category_classification","priority":"priority_level","business_context":"Generic test scenario validating core functionality and user requirements","functional_criticality":"Context-dependent importance based on business impact and user needs","domain_specific_rules":"industry_specific_validation_requirements","test_data_requirements":"domain_appropriate_data_requirements","preamble_actions":[optional_setup_steps],"steps":[{"action":"specific_action_instruction"},{"verify":"precise_validation_instruction"}],"reset_session":boolean_isolation_flag,"success_criteria":["measurable_success_conditions"],"cleanup_requirements":"optional_cleanup_specifications"}]
 ```
 
 """
 
+
+def get_test_case_planning_system_prompt(
+    business_objectives: str,
+    completed_cases: list | None = None,
+    reflection_history: list | None = None,
+    remaining_objectives: str | None = None,
+    language: str = 'zh-CN',
+) -> str:
+    """Generate system prompt for test case planning.
+
+    Args:
+        business_objectives: Business objectives
+        completed_cases: Completed test cases (for replanning)
+        language: Language for test case naming (zh-CN or en-US)
+        reflection_history: Reflection history (for replanning)
+        remaining_objectives: Remaining objectives (for replanning)
+
+    Returns:
+        Formatted system prompt string
+    """
+
+    business_objectives_str = _normalize_objectives(business_objectives)
+    return _build_planning_system_prompt(business_objectives_str, bool(completed_cases), language)
+
+
+@lru_cache(maxsize=64)
+def _build_planning_system_prompt(business_objectives_str: str, is_replan: bool, language: str) -> str:
+    """Build the planning system prompt; it only depends on the objectives,
+    the planning phase and the language, so it is cached across calls."""
+    has_business_objectives = bool(business_objectives_str) and not business_objectives_str.isspace()
+
+    # Determine if initial planning or replanning
+    if not is_replan:
+        # Decide mode based on whether business_objectives is empty
+        if has_business_objectives:
+            role_and_objective = _PLANNING_ROLE_INTENT
+            mode_section = _PLANNING_MODE_INTENT_TEMPLATE.substitute(business_objectives=business_objectives_str)
+        else:
+            role_and_objective = _PLANNING_ROLE_COMPREHENSIVE
+            mode_section = _PLANNING_MODE_COMPREHENSIVE
+    else:
+        # Replanning mode
+        role_and_objective = _PLANNING_ROLE_REPLAN
+        # Also decide mode based on business_objectives during replanning
+        if has_business_objectives:
+            mode_section = _PLANNING_MODE_REPLAN_INTENT_TEMPLATE.substitute(business_objectives=business_objectives_str)
+        else:
+            mode_section = _PLANNING_MODE_REPLAN_COMPREHENSIVE
+
+    shared_standards = get_shared_test_design_standards(language)
+
+    system_prompt = "".join((
+        "\n",
+        role_and_objective,
+        "\n\n",
+        mode_section,
+        "\n\n",
+        shared_standards,
+        _PLANNING_OUTPUT_FORMAT_BLOCK,
+    ))
+
     return system_prompt
 
 
 def get_test_case_planning_user_prompt(
     state_url: str,
     page_content_summary: dict,
-    page_structure: str ,
-    completed_cases: list = None,
-    reflection_history: list = None,
-    remaining_objectives: str = None,
+    page_structure: str,
+    completed_cases: list | None = None,
+    reflection_history: list | None = None,
+    remaining_objectives: str | None = None,
+    include_examples: bool | None = None,
 ) -> str:
     """Generate user prompt for test case planning.
 
@@ -444,34 +537,35 @@ def get_test_case_planning_user_prompt(
         completed_cases: Completed test cases (for replanning)
         reflection_history: Reflection history (for replanning)
         remaining_objectives: Remaining objectives (for replanning)
+        include_examples: Whether to append the example test cases; defaults to
+            initial planning only
 
     Returns:
         Formatted user prompt string
     """
+    if include_examples is None:
+        include_examples = not completed_cases
+
+    if not completed_cases and include_examples:
+        # Initial planning prompt only depends on the target URL
+        return _get_initial_planning_user_prompt(state_url)
+    return "".join(
+        iter_test_case_planning_user_prompt(
+            state_url, completed_cases, reflection_history, remaining_objectives, include_examples
+        )
+    )
 
-    context_section = ""
-    if completed_cases:
-        # Replanning mode
-        last_reflection = reflection_history[-1] if reflection_history else {}
-        context_section = f"""
-## Revision Context with Enhanced Business Understanding
-- **Completed Test Execution Summary**: {json.dumps(completed_cases, indent=2)}
-- **Previous Reflection Analysis**: {json.dumps(last_reflection, indent=2)}
-- **Remaining Coverage Objectives**: {remaining_objectives}
-- **Enhanced Domain Insights**: Apply deeper business context learned from execution results
-"""
 
-    user_prompt = f"""
-## Application Under Test (AUT)
-- **Target URL**: {state_url}
-- **Visual Element Reference (Referenced via attached screenshot) **: The attached screenshot contains numbered markers corresponding to interactive elements. Each number in the image maps to an element ID in the Interactive Elements Map above, providing precise visual-textual correlation for comprehensive UI analysis.
+@lru_cache(maxsize=64)
+def _get_initial_planning_user_prompt(state_url: str) -> str:
+    """Return the cached initial planning user prompt for a target URL."""
+    return "".join(iter_test_case_planning_user_prompt(state_url))
 
-{context_section}
 
-Please help me plan test cases based on the above information. Please conduct in-depth analysis according to the requirements in the system prompt and generate test cases that meet the specifications.
-Example 1:
+# Static test case examples appended to the planning user prompt
+_PLANNING_EXAMPLES = """Example 1:
 ```json
-{{
+{
   "name": "表单验证和错误处理-通用表单交互模式",
   "objective": "Validate form validation, error handling, and user feedback mechanisms",
   "test_category": "Functional_User_Interaction",
@@ -481,18 +575,18 @@ Example 1:
   "domain_specific_rules": "Form validation rules, error message standards, user feedback requirements",
   "test_data_requirements": "Valid data, invalid data, edge cases, boundary values",
   "preamble_actions": [
-    {{"action": "Navigate to the target form or input interface"}}
+    {"action": "Navigate to the target form or input interface"}
   ],
   "steps": [
-    {{"action": "Try to submit the form without filling in required fields"}},
-    {{"verify": "See helpful messages indicating which fields need to be completed"}},
-    {{"verify": "Notice the form prevents submission until requirements are met"}},
-    {{"action": "Fill in all required fields with appropriate information"}},
-    {{"action": "Include some optional information if relevant"}},
-    {{"action": "Submit the completed form"}},
-    {{"verify": "See confirmation that your form was processed successfully"}},
-    {{"action": "Test with invalid data to see error handling"}},
-    {{"verify": "Verify clear error messages guide you to correct input"}}
+    {"action": "Try to submit the form without filling in required fields"},
+    {"verify": "See helpful messages indicating which fields need to be completed"},
+    {"verify": "Notice the form prevents submission until requirements are met"},
+    {"action": "Fill in all required fields with appropriate information"},
+    {"action": "Include some optional information if relevant"},
+    {"action": "Submit the completed form"},
+    {"verify": "See confirmation that your form was processed successfully"},
+    {"action": "Test with invalid data to see error handling"},
+    {"verify": "Verify clear error messages guide you to correct input"}
   ],
   "reset_session": false,
   "success_criteria": [
@@ -502,14 +596,14 @@ Example 1:
     "User feedback is provided throughout the interaction"
   ],
   "cleanup_requirements": "No specific cleanup required - form submissions should be designed to not persist test data"
-}}
+}
 ```
 
 ### Example 2: Search & Data Retrieval
 **Information Discovery Template - Covers search, filtering, and data access patterns**
 
 ```json
-{{
+{
   "name": "搜索和数据检索-信息发现功能验证",
   "objective": "Validate search functionality, data retrieval, and information discovery features",
   "test_category": "Functional_Integration",
@@ -520,9 +614,9 @@ Example 1:
   "test_data_requirements": "Search terms, filters, ambiguous queries, special characters",
   "preamble_actions": [],
   "steps": [
-    {{"action": "Enter a common search term related to the content"}},
-    {{"action": "Click the search button and observe the process"}},
-    {{"verify": "See result count and any additional search options"}},
+    {"action": "Enter a common search term related to the content"},
+    {"action": "Click the search button and observe the process"},
+    {"verify": "See result count and any additional search options"},
   ],
   "reset_session": true,
   "success_criteria": [
@@ -532,27 +626,81 @@ Example 1:
     "System handles edge cases and ambiguous queries gracefully"
   ],
   "cleanup_requirements": "Clear search history and reset search state to ensure clean test environment"
-}}
+}
 ```
 
 """
 
-    return user_prompt
 
+_PLANNING_USER_PROMPT_AUT_HEADER = """
+## Application Under Test (AUT)
+- **Target URL**: """
 
-def get_reflection_system_prompt(language: str = 'zh-CN') -> str:
-    """Generate system prompt for reflection and replanning (static part).
+_PLANNING_USER_PROMPT_VISUAL_REFERENCE = """
+- **Visual Element Reference (Referenced via attached screenshot) **: The attached screenshot contains numbered markers corresponding to interactive elements. Each number in the image maps to an element ID in the Interactive Elements Map above, providing precise visual-textual correlation for comprehensive UI analysis.
+
+"""
+
+_PLANNING_USER_PROMPT_REQUEST = """
+
+Please help me plan test cases based on the above information. Please conduct in-depth analysis according to the requirements in the system prompt and generate test cases that meet the specifications.
+"""
+
+
+def iter_test_case_planning_user_prompt(
+    state_url: str,
+    completed_cases: list | None = None,
+    reflection_history: list | None = None,
+    remaining_objectives: str | None = None,
+    include_examples: bool = True,
+) -> Iterator[str]:
+    """Yield the user prompt for test case planning section by section.
+
+    Callers that can write fragments directly (e.g. into a request body) can
+    consume this instead of materializing the whole prompt.
 
     Args:
-        language: Language for test case naming (zh-CN or en-US)
+        state_url: Target URL
+        completed_cases: Completed test cases (for replanning)
+        reflection_history: Reflection history (for replanning)
+        remaining_objectives: Remaining objectives (for replanning)
+        include_examples: Whether to append the example test cases
 
-    Returns:
-        Formatted system prompt containing role definition, decision framework, and output format
+    Yields:
+        Consecutive prompt fragments
     """
-    name_language = '中文' if language == 'zh-CN' else 'English'
-    shared_standards = get_shared_test_design_standards(language)
+    yield _PLANNING_USER_PROMPT_AUT_HEADER
+    yield state_url
+    yield _PLANNING_USER_PROMPT_VISUAL_REFERENCE
+    if completed_cases:
+        # Replanning mode
+        # No reflection recorded yet on the first replanning round
+        last_reflection_json = _dumps_recorded(reflection_history[-1]) if reflection_history else "{}"
+        yield f"""
+## Revision Context with Enhanced Business Understanding
+- **Completed Test Execution Summary**: {_dumps_completed_cases(completed_cases)}
+- **Previous Reflection Analysis**: {last_reflection_json}
+- **Remaining Coverage Objectives**: {remaining_objectives}
+- **Enhanced Domain Insights**: Apply deeper business context learned from execution results
+"""
+    yield _PLANNING_USER_PROMPT_REQUEST
+    if include_examples:
+        yield _PLANNING_EXAMPLES
+
+
+# Output schemas of the reflection system prompt; the REPLAN schema only has the
+# naming language filled in
+_REFLECTION_SCHEMA_CONTINUE = """```json
+{"decision":"CONTINUE" | "FINISH","reasoning":"Comprehensive explanation of decision rationale including business context analysis, domain-specific insights, coverage analysis, objective assessment, and risk evaluation","business_value_analysis":{"business_objectives_achieved":number_of_achieved_objectives,"domain_coverage_percent":estimated_domain_coverage_percentage,"business_value_validated":boolean_assessment,"user_experience_quality":"assessment_of_user_experience_quality"},"coverage_analysis":{"functional_coverage_percent":estimated_percentage,"business_process_coverage":"assessment_of_business_workflow_validation","domain_compliance_status":"compliance_validation_status","remaining_risks":"assessment_of_outstanding_business_risks"},"new_plan":[]}
+```"""
 
-    return f"""## Role
+_REFLECTION_SCHEMA_REPLAN = Template("""```json
+{"decision":"REPLAN","reasoning":"Detailed explanation of why current plan is inadequate, including specific business context gaps, domain-specific issues, coverage gaps, or environmental changes","replan_strategy":{"business_context_enhancement":"approach_to_improve_business_relevance","domain_specific_improvements":"industry_specific_enhancements_to_testing","user_scenario_enhancement":"improve_user_perspective_and_natural_behavior_simulation","blocker_resolution":"approach_to_address_identified_blockers","coverage_enhancement":"strategy_to_improve_test_coverage","business_value_mitigation":"measures_to_address_business_value_risks"},"new_plan":[{"name":"修订后的测试用例（${name_language}命名）","objective":"clear_test_purpose_aligned_with_remaining_business_objectives","test_category":"enhanced_category_classification","priority":"priority_based_on_business_impact","business_context":"Enhanced test scenario with business context and domain-specific validation","domain_specific_rules":"industry_specific_validation_requirements","test_data_requirements":"domain_appropriate_data_requirements","steps":[{"action":"action_instruction"},{"verify":"validation_instruction"}],"preamble_actions":["optional_setup_steps"],"reset_session":boolean_flag,"success_criteria":["measurable_business_success_conditions"],"cleanup_requirements":["optional_cleanup_actions"]}]}
+```""")
+
+
+# Reflection system prompt template, rendered with the output schemas and shared_standards
+_REFLECTION_SYSTEM_PROMPT_TEMPLATE = Template("""## Role
 You are a Senior QA Testing Professional responsible for dynamic test execution oversight with enhanced business domain awareness and contextual understanding. Your expertise includes business process analysis, domain-specific testing, user experience evaluation, and strategic decision-making based on comprehensive execution insights.
 
 ## Mission
@@ -624,62 +772,12 @@ IF (len(completed_cases) < len(current_plan)
 ## Enhanced Output Format (Strict JSON Schema)
 
 ### For CONTINUE or FINISH Decisions:
-```json
-{{
-  "decision": "CONTINUE" | "FINISH",
-  "reasoning": "Comprehensive explanation of decision rationale including business context analysis, domain-specific insights, coverage analysis, objective assessment, and risk evaluation",
-  "business_value_analysis": {{
-    "business_objectives_achieved": number_of_achieved_objectives,
-    "domain_coverage_percent": estimated_domain_coverage_percentage,
-    "business_value_validated": boolean_assessment,
-    "user_experience_quality": "assessment_of_user_experience_quality"
-  }},
-  "coverage_analysis": {{
-    "functional_coverage_percent": estimated_percentage,
-    "business_process_coverage": "assessment_of_business_workflow_validation",
-    "domain_compliance_status": "compliance_validation_status",
-    "remaining_risks": "assessment_of_outstanding_business_risks"
-  }},
-  "new_plan": []
-}}
-```
+${schema_continue}
 
 ### For REPLAN Decision:
-```json
-{{
-  "decision": "REPLAN",
-  "reasoning": "Detailed explanation of why current plan is inadequate, including specific business context gaps, domain-specific issues, coverage gaps, or environmental changes",
-  "replan_strategy": {{
-    "business_context_enhancement": "approach_to_improve_business_relevance",
-    "domain_specific_improvements": "industry_specific_enhancements_to_testing",
-    "user_scenario_enhancement": "improve_user_perspective_and_natural_behavior_simulation",
-    "blocker_resolution": "approach_to_address_identified_blockers",
-    "coverage_enhancement": "strategy_to_improve_test_coverage",
-    "business_value_mitigation": "measures_to_address_business_value_risks"
-  }},
-  "new_plan": [
-    {{
-      "name": "修订后的测试用例（{name_language}命名）",
-      "objective": "clear_test_purpose_aligned_with_remaining_business_objectives",
-      "test_category": "enhanced_category_classification",
-      "priority": "priority_based_on_business_impact",
-      "business_context": "Enhanced test scenario with business context and domain-specific validation",
-      "domain_specific_rules": "industry_specific_validation_requirements",
-      "test_data_requirements": "domain_appropriate_data_requirements",
-      "steps": [
-        {{"action": "action_instruction"}},
-        {{"verify": "validation_instruction"}}
-      ],
-      "preamble_actions": ["optional_setup_steps"],
-      "reset_session": boolean_flag,
-      "success_criteria": ["measurable_business_success_conditions"],
-      "cleanup_requirements": ["optional_cleanup_actions"]
-    }}
-  ]
-}}
-```
+${schema_replan}
 
-{shared_standards}
+${shared_standards}
 
 ## Enhanced Decision Quality Standards
 - **Business Context-Aware**: All decisions must consider business domain, user needs, and industry context
@@ -690,67 +788,53 @@ IF (len(completed_cases) < len(current_plan)
 - **Value-Focused**: Prioritize business value validation and user experience quality
 - **Domain-Appropriate**: Ensure all decisions reflect industry-specific patterns and requirements
 - **Traceability**: Provide clear rationale linking analysis to strategic decisions
-- **Progress-Oriented**: Favor CONTINUE decisions when tests are progressing normally to avoid unnecessary interruptions"""
+- **Progress-Oriented**: Favor CONTINUE decisions when tests are progressing normally to avoid unnecessary interruptions""")
 
 
-def get_reflection_user_prompt(
-    business_objectives: str,
-    current_plan: list,
-    completed_cases: list,
-    page_structure: str,
-    page_content_summary: dict = None,
-) -> str:
-    """Generate user prompt for reflection and replanning (dynamic part).
+@lru_cache(maxsize=4)
+def get_reflection_system_prompt(language: str = 'zh-CN') -> str:
+    """Generate system prompt for reflection and replanning (static part).
 
     Args:
-        business_objectives: Overall business objectives
-        current_plan: Current test plan
-        completed_cases: Completed test cases
-        page_structure: Current UI text structure
-        page_content_summary: Interactive element mapping (dict from ID to element info), optional
+        language: Language for test case naming (zh-CN or en-US)
 
     Returns:
-        Formatted user prompt containing current test status and context information
+        Formatted system prompt containing role definition, decision framework, and output format
     """
+    name_language = '中文' if language == 'zh-CN' else 'English'
+    context = {
+        'schema_continue': _REFLECTION_SCHEMA_CONTINUE,
+        'schema_replan': _REFLECTION_SCHEMA_REPLAN.substitute(name_language=name_language),
+        'shared_standards': get_shared_test_design_standards(language),
+    }
+    return _REFLECTION_SYSTEM_PROMPT_TEMPLATE.substitute(context)
 
-    completed_summary = json.dumps(completed_cases, indent=2)
-    current_plan_json = json.dumps(current_plan, indent=2)
 
-    # Build interactive elements mapping section
-    interactive_elements_section = ""
-    if page_content_summary:
-        interactive_elements_json = json.dumps(page_content_summary, indent=2)
-        interactive_elements_section = f"""
-- **Interactive Elements Map**:
-{interactive_elements_json}
-- **Visual Element Reference**: The attached screenshot contains numbered markers corresponding to interactive elements. Each number in the image maps to an element ID in the Interactive Elements Map above, providing precise visual-textual correlation for comprehensive UI analysis."""
-
-    # Determine test mode for reflection decision
-    # Handle case where business_objectives might be a list
-    business_objectives_str = business_objectives if isinstance(business_objectives, str) else str(business_objectives) if business_objectives else ""
-    if business_objectives_str and business_objectives_str.strip():
-        mode_context = f"""
+# Mode-specific sections of the reflection user prompt
+_INTENT_MODE_CONTEXT_TEMPLATE = Template("""
 ## Testing Mode: Enhanced Context-Aware Intent-Driven Testing
-**Original Business Objectives**: {business_objectives_str}
+**Original Business Objectives**: ${business_objectives}
 
 ### Enhanced Mode-Specific Success Criteria:
 - **Business Requirements Compliance**: All specified business objectives must be addressed with domain context
 - **Constraint Satisfaction**: Any specified constraints (test case count, specific elements) must be met
 - **Domain-Appropriate Coverage**: Test cases should reflect industry-specific patterns and business processes
 - **Business Value Validation**: Tests should validate actual business value and user benefits
-"""
-        coverage_criteria = """
+""")
+
+_INTENT_COVERAGE_CRITERIA = """
 - **Business Requirements Coverage**: Percentage of specified business objectives validated with domain context
 - **Constraint Compliance**: Adherence to specified test case counts or element focus
 - **Business Intent Alignment**: How well test cases address the specific business requirements and domain needs
 - **Domain-Specific Validation**: Industry-specific scenarios and compliance requirements coverage
 - **Business Criticality**: Critical business objectives and high-impact scenarios prioritization
 """
-        mode_specific_logic = """
+
+_INTENT_MODE_LOGIC = """
 - **Enhanced Intent-Driven Mode**: FINISH if all specified business objectives are achieved with proper domain context AND constraints are satisfied AND business value is validated
 """
-    else:
-        mode_context = """
+
+_COMPREHENSIVE_MODE_CONTEXT = """
 ## Testing Mode: Enhanced Comprehensive Context-Aware Testing
 **Original Objectives**: Comprehensive testing with enhanced domain understanding
 
@@ -760,28 +844,55 @@ def get_reflection_user_prompt(
 - **Business Process Validation**: Include validation of end-to-end business processes and workflows
 - **User Experience Quality**: Assess usability, accessibility, and user satisfaction metrics
 """
-        coverage_criteria = """
+
+_COMPREHENSIVE_COVERAGE_CRITERIA = """
 - **Element Coverage**: Percentage of interactive elements tested with business context
 - **Functional Coverage**: Coverage of all core business functionalities and processes
 - **Business Process Coverage**: End-to-end workflow validation and business logic testing
 - **Domain-Specific Coverage**: Industry-specific scenarios and compliance requirements
 - **User Journey Coverage**: Complete user path validation and experience testing
 """
-        mode_specific_logic = """
+
+_COMPREHENSIVE_MODE_LOGIC = """
 - **Enhanced Comprehensive Mode**: FINISH if all interactive elements are tested AND core functionalities are validated AND business processes are verified AND user experience is assessed
 """
 
-    user_prompt = f"""{mode_context}
+
+@lru_cache(maxsize=16)
+def _reflection_mode_sections(business_objectives: str) -> tuple[str, str, str]:
+    """Return the mode context, coverage criteria and decision logic sections.
+
+    The objectives stay the same for a whole run, so the sections are only
+    rendered once per objectives string.
+    """
+    has_objectives = bool(business_objectives) and not business_objectives.isspace()
+    if has_objectives:
+        mode_context = _INTENT_MODE_CONTEXT_TEMPLATE.substitute(business_objectives=business_objectives)
+        return mode_context, _INTENT_COVERAGE_CRITERIA, _INTENT_MODE_LOGIC
+    return _COMPREHENSIVE_MODE_CONTEXT, _COMPREHENSIVE_COVERAGE_CRITERIA, _COMPREHENSIVE_MODE_LOGIC
+
+
+# Mode-invariant pieces of the reflection user prompt, in order; the dynamic
+# sections are joined in between them
+_REFLECTION_SEG_PLAN = """
 
 ## Enhanced Execution Context Analysis
 - **Current Test Plan**:
-{current_plan_json}
+"""
+
+_REFLECTION_SEG_COMPLETED = """
 - **Completed Test Execution Summary**:
-{completed_summary}
-- **Current Application State**: (Referenced via attached screenshot){interactive_elements_section}
+"""
+
+_REFLECTION_SEG_APP_STATE = """
+- **Current Application State**: (Referenced via attached screenshot)"""
+
+_REFLECTION_SEG_COVERAGE = """
 
 ## Enhanced Coverage Analysis Criteria
-{coverage_criteria}
+"""
+
+_REFLECTION_SEG_OBJECTIVES = """
 - **Business Process Coverage**: End-to-end workflow validation completeness
 - **User Experience Coverage**: Usability, accessibility, and user satisfaction validation
 - **User Scenario Realism**: Test steps designed from actual user perspective with natural behavior patterns
@@ -795,7 +906,9 @@ def get_reflection_user_prompt(
 - **Business Value Objectives**: Measurable business outcomes and ROI achievement evaluation
 
 ## Enhanced Mode-Specific Decision Logic
-{mode_specific_logic}
+"""
+
+_REFLECTION_SEG_DECISION = """
 
 **Enhanced Decision Logic**:
 - **All Business Objectives Achieved** AND **All Planned Cases Complete** AND **Business Value Validated** → Decision: `FINISH`
@@ -803,15 +916,171 @@ def get_reflection_user_prompt(
 
 Please analyze the current test execution status based on the above context and decision framework, then provide your strategic decision in the required JSON format."""
 
-    return user_prompt
+
+def get_reflection_user_prompt(
+    business_objectives: str,
+    current_plan: list,
+    completed_cases: list,
+    page_content_summary: dict | None = None,
+) -> str:
+    """Generate user prompt for reflection and replanning (dynamic part).
+
+    Args:
+        business_objectives: Overall business objectives
+        current_plan: Current test plan
+        completed_cases: Completed test cases
+        page_content_summary: Interactive element mapping (dict from ID to element info), optional
+
+    Returns:
+        Formatted user prompt containing current test status and context information
+    """
+    return "".join(
+        iter_reflection_user_prompt(business_objectives, current_plan, completed_cases, page_content_summary)
+    )
+
+
+def iter_reflection_user_prompt(
+    business_objectives: str,
+    current_plan: list,
+    completed_cases: list,
+    page_content_summary: dict | None = None,
+) -> Iterator[str]:
+    """Yield the reflection user prompt section by section.
+
+    Like ``iter_test_case_planning_user_prompt``, this lets callers stream the
+    fragments instead of materializing the whole prompt.
+
+    Args:
+        business_objectives: Overall business objectives
+        current_plan: Current test plan
+        completed_cases: Completed test cases
+        page_content_summary: Interactive element mapping (dict from ID to element info), optional
+
+    Yields:
+        Consecutive prompt fragments
+    """
+    # Build interactive elements mapping section
+    interactive_elements_section = ""
+    if page_content_summary:
+        if len(page_content_summary) > MAX_PROMPT_ELEMENTS:
+            logging.debug(
+                f"Interactive element map has {len(page_content_summary)} elements, "
+                f"embedding the compact form (tag and short text only)"
+            )
+            page_content_summary = _compact_elements(page_content_summary)
+        interactive_elements_section = (
+            _INTERACTIVE_ELEMENTS_PREFIX + _dumps(page_content_summary) + _INTERACTIVE_ELEMENTS_SUFFIX
+        )
+
+    # Determine test mode for reflection decision
+    business_objectives_str = _normalize_objectives(business_objectives)
+    mode_context, coverage_criteria, mode_specific_logic = _reflection_mode_sections(business_objectives_str)
+
+    # Serialize execution context only once the prompt is assembled; a missing
+    # plan or case list renders as an empty list
+    current_plan_json = _dumps_current_plan(current_plan or [])
+    completed_summary = _dumps_completed_cases(completed_cases or [])
+
+    yield mode_context
+    yield _REFLECTION_SEG_PLAN
+    yield current_plan_json
+    yield _REFLECTION_SEG_COMPLETED
+    yield completed_summary
+    yield _REFLECTION_SEG_APP_STATE
+    yield interactive_elements_section
+    yield _REFLECTION_SEG_COVERAGE
+    yield coverage_criteria
+    yield _REFLECTION_SEG_OBJECTIVES
+    yield mode_specific_logic
+    yield _REFLECTION_SEG_DECISION
+
+
+# Runtime bookkeeping on planned cases that the reflection step does not need
+REFLECTION_RUNTIME_FIELDS = ("completed_steps", "test_context")
+
+
+def _project_plan_case(case: dict) -> dict:
+    """Drop the runtime bookkeeping (completed steps, test context) from a
+    planned case.
+
+    Steps and success criteria are kept: reflection checks whether the
+    remaining cases can still run against the current page and carries them
+    over into a REPLAN.
+    """
+    return {key: value for key, value in case.items() if key not in REFLECTION_RUNTIME_FIELDS}
+
+
+# Serialized plan cases keyed by id(); a deep copy of the projected case is
+# stored too, since a planned case (e.g. its status) may still change between
+# reflections
+_PLAN_JSON_CACHE: OrderedDict[int, tuple[dict, dict, str]] = OrderedDict()
+_PLAN_JSON_CACHE_SIZE = 256
+
+
+def _dumps_current_plan(current_plan: list) -> str:
+    """Serialize the projected plan, re-encoding only cases that are new or
+    whose projected fields changed since the last reflection round.
+
+    The output is identical to ``_dumps([_project_plan_case(c) for c in current_plan])``.
+    """
+    fragments = []
+    for case in current_plan:
+        projected = _project_plan_case(case)
+        cached = _PLAN_JSON_CACHE.get(id(case))
+        if cached is not None and cached[0] is case and cached[1] == projected:
+            _PLAN_JSON_CACHE.move_to_end(id(case))
+            fragments.append(cached[2])
+            continue
+        fragment = _dumps(projected)
+        _PLAN_JSON_CACHE[id(case)] = (case, copy.deepcopy(projected), fragment)
+        if len(_PLAN_JSON_CACHE) > _PLAN_JSON_CACHE_SIZE:
+            _PLAN_JSON_CACHE.popitem(last=False)
+        fragments.append(fragment)
+    return "[" + ",".join(fragments) + "]"
+
+
+# Interactive elements section of the reflection user prompt, around the element map JSON
+_INTERACTIVE_ELEMENTS_PREFIX = """
+- **Interactive Elements Map**:
+"""
+_INTERACTIVE_ELEMENTS_SUFFIX = """
+- **Visual Element Reference**: The attached screenshot contains numbered markers corresponding to interactive elements. Each number in the image maps to an element ID in the Interactive Elements Map above, providing precise visual-textual correlation for comprehensive UI analysis."""
+
+
+def _compact_elements(summary: dict) -> dict:
+    """Reduce an oversized interactive element map to a prompt-friendly size.
+
+    Every element ID is kept, since reflection judges coverage against the
+    full set of interactive elements. Only the tag name and a short inner
+    text (whitespace collapsed, then truncated) remain; attributes and
+    positional fields are dropped.
+
+    Args:
+        summary: Interactive element mapping (dict from ID to element info)
+
+    Returns:
+        Compacted element mapping
+    """
+    compact = {}
+    for element_id, element in summary.items():
+        if not isinstance(element, dict):
+            compact[element_id] = element
+            continue
+        compact_element = {}
+        if element.get('tagName'):
+            compact_element['tagName'] = element['tagName']
+        inner_text = element.get('innerText')
+        if inner_text:
+            compact_element['innerText'] = _WHITESPACE_RE.sub(' ', inner_text)[:MAX_ELEMENT_TEXT_LENGTH]
+        compact[element_id] = compact_element
+    return compact
 
 
 def get_reflection_prompt(
     business_objectives: str,
     current_plan: list,
     completed_cases: list,
-    page_structure: str,
-    page_content_summary: dict = None,
+    page_content_summary: dict | None = None,
     language: str = 'zh-CN',
 ) -> tuple[str, str]:
     """Generate prompts for reflection and replanning (returns system and user prompt).
@@ -821,7 +1090,6 @@ def get_reflection_prompt(
         language: Language for test case naming (zh-CN or en-US)
         current_plan: Current test plan
         completed_cases: Completed test cases
-        page_structure: Current UI text structure
         page_content_summary: Interactive element mapping (dict from ID to element info), optional
 
     Returns:
@@ -829,6 +1097,6 @@ def get_reflection_prompt(
     """
     system_prompt = get_reflection_system_prompt(language)
     user_prompt = get_reflection_user_prompt(
-        business_objectives, current_plan, completed_cases, page_structure, page_content_summary
+        business_objectives, current_plan, completed_cases, page_content_summary
     )
     return system_prompt, user_prompt
\ No newline at end of file
@@ -4,18 +4,62 @@ testing application.
 This tool allows the agent to interact with the web page.
 """
 
-import datetime
+import asyncio
+import base64
+import hashlib
 import json
 import logging
+import re
+import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 
 from langchain_core.tools import BaseTool
 from pydantic import Field
 
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except Exception:
+    _ORJSON_AVAILABLE = False
+
 from webqa_agent.crawler.deep_crawler import DeepCrawler
 from webqa_agent.testers.case_gen.prompts.tool_prompts import get_error_detection_prompt
 from webqa_agent.testers.function_tester import UITester
 
+# Upper bound on the viewport text sent to the error detection LLM
+MAX_ERROR_DETECTION_PAGE_TEXT = 6000
+
+# Actions that can trigger validation or fail their intent; these always get the LLM error check
+_ERROR_CHECK_ACTIONS = frozenset({"click", "type", "selectdropdown"})
+
+# Any of these in the page text means other actions are checked as well
+_VALIDATION_MARKER_RE = re.compile(r"error|invalid|required|fail(?:ed|ure)?|错误|失败|必填|无效", re.IGNORECASE)
+
+# Error detection results for identical (action, page text, screenshot) inputs,
+# so retried actions on an unchanged page skip the LLM round-trip
+_ERROR_CHECK_CACHE: OrderedDict[tuple, Dict[str, Any]] = OrderedDict()
+_ERROR_CHECK_CACHE_SIZE = 128
+
+
+def _error_check_key(
+    action: str, target: str, value: Optional[str], intent: str, page_structure: str, screenshot_digest: Optional[bytes]
+) -> tuple:
+    """Build the error detection cache key; page text is reduced to a
+    digest."""
+    page_digest = hashlib.blake2b(page_structure.encode(), digest_size=16).digest()
+    return action, target, value, intent, page_digest, screenshot_digest
+
+
+# Instruction phrase builders keyed by lower-cased action, called with (target, value, clear_before_type)
+_ACTION_PHRASE = {
+    "click": lambda t, v, c: f"Click on the {t}",
+    "type": lambda t, v, c: f"Clear the {t} field and then type '{v}'" if c else f"Type '{v}' in the {t}",
+    "selectdropdown": lambda t, v, c: f"From the {t}, select the option '{v}'",
+    "scroll": lambda t, v, c: f"Scroll {v or 'down'} on the page",
+    "clear": lambda t, v, c: f"Clear the content of {t}",
+}
+
 
 class UITool(BaseTool):
     """A tool to interact with a UI via a UITester instance."""
@@ -26,12 +70,15 @@ class UITool(BaseTool):
 
     async def get_full_page_context(
         self, include_screenshot: bool = False, viewport_only: bool = True
-    ) -> tuple[str, str | None]:
+    ) -> tuple[str, str | None, bytes | None]:
         """Helper to get a token-efficient summary of the page structure.
 
         Args:
             include_screenshot: 是否包含截图
             viewport_only: 是否只获取视窗内容，默认True（用于错误检测场景）
+
+        Returns:
+            (page_structure, base64 screenshot, digest of the raw screenshot bytes)
         """
         logging.debug(f"Retrieving page context for analysis (viewport_only={viewport_only})")
         page = self.ui_tester_instance.driver.get_page()
@@ -40,50 +87,77 @@ class UITool(BaseTool):
         page_structure = dp.get_text()
 
         screenshot = None
+        screenshot_digest = None
         if include_screenshot:
             logging.debug("Capturing post-action screenshot")
-            screenshot = await self.ui_tester_instance._actions.b64_page_screenshot(
-                file_name="check_ui_error", save_to_log=False, full_page=not viewport_only
+            # Hash the raw PNG once here instead of the base64 string downstream
+            screenshot_bytes = await self.ui_tester_instance._actions.take_screenshot(
+                page, full_page=not viewport_only, timeout=30000
             )
+            screenshot_digest = hashlib.blake2b(screenshot_bytes, digest_size=16).digest()
+            screenshot_b64 = await asyncio.to_thread(base64.b64encode, screenshot_bytes)
+            screenshot = f"data:image/png;base64,{screenshot_b64.decode('utf-8')}"
             await dp.remove_marker()
 
         logging.debug(f"Page structure length: {len(page_structure)} characters")
-        return page_structure, screenshot
+        return page_structure, screenshot, screenshot_digest
 
     async def _check_for_ui_error(
-        self, action: str, target: str, value: Optional[str], intent: str, page_structure: str, screenshot: str
+        self,
+        action: str,
+        target: str,
+        value: Optional[str],
+        intent: str,
+        page_structure: str,
+        screenshot: str,
+        screenshot_digest: Optional[bytes] = None,
     ) -> Dict[str, Any]:
         """Uses an LLM to check for a UI validation error after an action."""
         logging.debug(f"Starting UI error detection for action: {action} on {target}")
         logging.debug(f"Error detection intent: {intent}")
 
-        prompt = get_error_detection_prompt()
+        prompt = get_error_detection_prompt(
+            compact=bool(self.ui_tester_instance.llm.llm_config.get("compact_error_prompt", False))
+        )
+        if len(page_structure) > MAX_ERROR_DETECTION_PAGE_TEXT:
+            page_structure = page_structure[:MAX_ERROR_DETECTION_PAGE_TEXT] + "..."
         llm_input = (
             f"Action Intent: {intent}\n"
             f"Action: {action} on element '{target}' with value '{value}'.\n\n"
             f"Page Text Structure:\n{page_structure}"
         )
 
-        logging.debug(f"Error detection LLM input length: {len(llm_input)} characters")
-        logging.debug(
-            f"Error detection page structure: {page_structure[:500]}{'...' if len(page_structure) > 500 else ''}"
-        )
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Error detection LLM input length: {len(llm_input)} characters")
+            logging.debug(
+                f"Error detection page structure: {page_structure[:500]}{'...' if len(page_structure) > 500 else ''}"
+            )
+
+        if screenshot_digest is None and screenshot:
+            screenshot_digest = hashlib.blake2b(screenshot.encode(), digest_size=16).digest()
+        cache_key = _error_check_key(action, target, value, intent, page_structure, screenshot_digest)
+        cached_result = _ERROR_CHECK_CACHE.get(cache_key)
+        if cached_result is not None:
+            _ERROR_CHECK_CACHE.move_to_end(cache_key)
+            logging.debug("Page unchanged since an identical action; reusing error detection result")
+            return dict(cached_result)
 
         # Use the same LLM instance from the ui_tester
         llm = self.ui_tester_instance.llm
         try:
             logging.debug("Starting UI error detection - Sending request to LLM...")
-            start_time = datetime.datetime.now()
+            start_time = time.perf_counter()
 
             response_str = await llm.get_llm_response(system_prompt=prompt, prompt=llm_input, images=screenshot)
 
-            end_time = datetime.datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
 
-            logging.debug(f"UI error detection completed in {duration:.2f} seconds")
-            logging.debug(f"Error detection response: {response_str[:500]}...")
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(f"UI error detection completed in {duration:.2f} seconds")
+                logging.debug(f"Error detection response: {response_str[:500]}...")
 
-            result = json.loads(response_str)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the handler below covers both
+            result = orjson.loads(response_str) if _ORJSON_AVAILABLE else json.loads(response_str)
             error_detected = result.get("error_detected", False)
             error_message = result.get("error_message", "")
 
@@ -93,7 +167,10 @@ class UITool(BaseTool):
             else:
                 logging.debug("No UI validation errors detected")
 
-            return result
+            _ERROR_CHECK_CACHE[cache_key] = result
+            if len(_ERROR_CHECK_CACHE) > _ERROR_CHECK_CACHE_SIZE:
+                _ERROR_CHECK_CACHE.popitem(last=False)
+            return dict(result)
 
         except json.JSONDecodeError as e:
             logging.error(f"Failed to decode JSON from error detection LLM: {e}")
@@ -127,11 +204,13 @@ class UITool(BaseTool):
             logging.error(error_msg)
             return f"[FAILURE] Error: {error_msg}"
 
-        logging.debug(f"=== Executing UI Action: {action} ===")
-        logging.debug(f"Target: {target}")
-        logging.debug(f"Value: {value}")
-        logging.debug(f"Description: {description}")
-        logging.debug(f"Clear before type: {clear_before_type}")
+        debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logging.debug(f"=== Executing UI Action: {action} ===")
+            logging.debug(f"Target: {target}")
+            logging.debug(f"Value: {value}")
+            logging.debug(f"Description: {description}")
+            logging.debug(f"Clear before type: {clear_before_type}")
 
         # Build the instruction for ui_tester.action()
         instruction_parts = []
@@ -141,20 +220,12 @@ class UITool(BaseTool):
             logging.debug(f"Using custom description: {description}")
 
         # Build the action phrase
-        if action.lower() == "click":
-            action_phrase = f"Click on the {target}"
-        elif action.lower() == "type":
-            if clear_before_type:
-                action_phrase = f"Clear the {target} field and then type '{value}'"
+        action_key = action.lower()
+        phrase_builder = _ACTION_PHRASE.get(action_key)
+        if phrase_builder:
+            action_phrase = phrase_builder(target, value, clear_before_type)
+            if action_key == "type" and clear_before_type:
                 logging.debug("Using clear-before-type strategy")
-            else:
-                action_phrase = f"Type '{value}' in the {target}"
-        elif action.lower() == "selectdropdown":
-            action_phrase = f"From the {target}, select the option '{value}'"
-        elif action.lower() == "scroll":
-            action_phrase = f"Scroll {value or 'down'} on the page"
-        elif action.lower() == "clear":
-            action_phrase = f"Clear the content of {target}"
         else:
             action_phrase = f"{action} on {target}"
             if value:
@@ -166,19 +237,21 @@ class UITool(BaseTool):
             instruction_parts.append(action_phrase)
 
         instruction = " - ".join(instruction_parts)
-        logging.debug(f"Built instruction for UITester: {instruction}")
+        if debug_enabled:
+            logging.debug(f"Built instruction for UITester: {instruction}")
 
         try:
-            logging.debug(f"Executing UI action: {instruction}")
-            start_time = datetime.datetime.now()
+            if debug_enabled:
+                logging.debug(f"Executing UI action: {instruction}")
+            start_time = time.perf_counter()
 
             execution_steps, result = await self.ui_tester_instance.action(instruction)
 
-            end_time = datetime.datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
 
-            logging.debug(f"UI action completed in {duration:.2f} seconds")
-            logging.debug(f"UI action result type: {type(result)}")
+            if debug_enabled:
+                logging.debug(f"UI action completed in {duration:.2f} seconds")
+                logging.debug(f"UI action result type: {type(result)}")
 
             # First, check for a hard failure from the action executor
             if not result.get("success"):
@@ -194,7 +267,7 @@ class UITool(BaseTool):
                 return f"[FAILURE] {error_message}"
 
             logging.debug("Action execution successful, retrieving page context")
-            page_structure, screenshot = await self.get_full_page_context(include_screenshot=True)
+            page_structure, screenshot, screenshot_digest = await self.get_full_page_context(include_screenshot=True)
 
             if not isinstance(result, dict):
                 error_msg = f"Action did not return a dictionary. Got: {type(result)}"
@@ -202,10 +275,20 @@ class UITool(BaseTool):
                 return f"[FAILURE] Error: {error_msg}"
 
             # --- Enhanced LLM-based UI Error Detection ---
-            logging.debug("Starting enhanced UI error detection")
-            error_check_result = await self._check_for_ui_error(
-                action, target, value, description or f"{action} {target}", page_structure, screenshot
-            )
+            if action_key not in _ERROR_CHECK_ACTIONS and not _VALIDATION_MARKER_RE.search(page_structure):
+                logging.debug(f"Skipping UI error detection for '{action}': no validation markers on page")
+                error_check_result = {"error_detected": False}
+            else:
+                logging.debug("Starting enhanced UI error detection")
+                error_check_result = await self._check_for_ui_error(
+                    action,
+                    target,
+                    value,
+                    description or f"{action} {target}",
+                    page_structure,
+                    screenshot,
+                    screenshot_digest,
+                )
 
             # Process error detection result and format output accordingly
             if error_check_result.get("error_detected", False):
@@ -13,25 +13,25 @@ def check_repetition(case: dict) -> str:
 
     # Check for repeated element interactions
     for element, data in test_context.get("tested_elements", {}).items():
-        if data.get("test_count", 0) >= 2:
-            recent_failures = [r for r in data.get("results", [])[-2:] if not r.get("success")]
-            if len(recent_failures) >= 2:
-                warnings.append(
-                    f"⚠️ REPETITION WARNING: Element '{element}' has failed multiple times recently. AVOID interacting with it again."
-                )
-            elif data.get("test_count", 0) >= 3:
-                warnings.append(
-                    f"⚠️ REPETITION WARNING: Element '{element}' has been tested multiple times. Consider a different element or action."
-                )
+        test_count = data.get("test_count", 0)
+        if test_count < 2:
+            continue
+        results = data.get("results", ())
+        if len(results) >= 2 and not results[-1].get("success") and not results[-2].get("success"):
+            warnings.append(
+                f"⚠️ REPETITION WARNING: Element '{element}' has failed multiple times recently. AVOID interacting with it again."
+            )
+        elif test_count >= 3:
+            warnings.append(
+                f"⚠️ REPETITION WARNING: Element '{element}' has been tested multiple times. Consider a different element or action."
+            )
 
     # Check for repeated action paths
     test_path = test_context.get("test_path", [])
-    if len(test_path) >= 3:
-        recent_path = test_path[-3:]
-        if len(set(recent_path)) == 1:
-            warnings.append(
-                f"⚠️ REPETITION WARNING: You are repeating the exact same action '{recent_path[0]}' three times in a row. You MUST choose a different action."
-            )
+    if len(test_path) >= 3 and test_path[-1] == test_path[-2] == test_path[-3]:
+        warnings.append(
+            f"⚠️ REPETITION WARNING: You are repeating the exact same action '{test_path[-1]}' three times in a row. You MUST choose a different action."
+        )
 
     if warnings:
         return "=== REPETITION WARNINGS ===\n" + "\n".join(warnings) + "\n"
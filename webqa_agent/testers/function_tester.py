@@ -1,7 +1,10 @@
 import asyncio
+import hashlib
 import json
 import logging
-from datetime import datetime
+import re
+import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple
 
 from webqa_agent.actions.action_executor import ActionExecutor
@@ -12,6 +15,95 @@ from webqa_agent.crawler.deep_crawler import DeepCrawler, ElementKey
 from webqa_agent.llm.llm_api import LLMAPI
 from webqa_agent.llm.prompt import LLMPrompt
 
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except Exception:
+    _ORJSON_AVAILABLE = False
+
+class PlanFormatError(ValueError):
+    """The planner answered, but not with a JSON plan containing actions."""
+
+
+# Appended to the planning request after a PlanFormatError
+_STRICT_PLAN_REMINDER = "\n\nReturn strict JSON with an 'actions' array."
+
+# Actions that do not kick off page work of their own; they only get a short
+# settle pause. Everything else (clicks, typing, selects, scrolls that may
+# lazy-load, navigation) keeps the full settle time, since in-page XHR or SPA
+# updates neither change page.url nor hold back the networkidle load state.
+_QUIET_ACTIONS = frozenset({"Sleep", "Clear", "FalsyConditionStatement"})
+
+# Upper bound on the page text sent with a verification prompt
+MAX_VERIFY_PAGE_TEXT = 8000
+
+# Latin words and CJK character pairs used to score page text against an assertion
+_KEYWORD_RE = re.compile(r"[a-z0-9]{2,}|[\u4e00-\u9fff]{2}")
+
+# Raw LLM responses for identical (system prompt, prompt, screenshots) inputs; only
+# responses that parsed successfully are stored, so retries after a bad answer still hit the LLM.
+# Plans are stored only after they executed successfully, so a failed plan is never replayed
+_LLM_RESPONSE_CACHE: OrderedDict[tuple, str] = OrderedDict()
+_LLM_RESPONSE_CACHE_SIZE = 64
+
+
+def _llm_cache_key(model: str, system_prompt: str, prompt: str, images) -> tuple:
+    """Build the response cache key; prompts and screenshots are reduced to
+    digests."""
+    if isinstance(images, str):
+        images = [images]
+    digests = tuple(hashlib.blake2b(image.encode(), digest_size=16).digest() for image in images or () if image)
+    prompt_digest = hashlib.blake2b(f"{system_prompt}\0{prompt}".encode(), digest_size=16).digest()
+    return model, prompt_digest, digests
+
+
+def _timestamp() -> str:
+    """Current local time in the format used for step and case times."""
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _dumps_model_io(plan: Dict[str, Any]) -> str:
+    """Pretty-print a plan for the step's modelIO field.
+
+    orjson's indented output matches json.dumps(indent=2, ensure_ascii=False)
+    and is used when installed.
+    """
+    if _ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(plan, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(plan, indent=2, ensure_ascii=False)
+
+
+def _truncate_page_structure(page_structure: str, query: str, max_chars: int = MAX_VERIFY_PAGE_TEXT) -> str:
+    """Trim a get_text() JSON array to max_chars, keeping the text blocks that
+    share the most keywords with the query, in page order."""
+    if len(page_structure) <= max_chars:
+        return page_structure
+    try:
+        blocks = json.loads(page_structure)
+    except json.JSONDecodeError:
+        return page_structure[:max_chars]
+
+    keywords = set(_KEYWORD_RE.findall(query.lower()))
+    lowered = [str(block).lower() for block in blocks]
+    ranked = sorted(range(len(blocks)), key=lambda i: (-sum(1 for k in keywords if k in lowered[i]), i))
+    kept, budget = [], max_chars - 2  # enclosing brackets
+    for i in ranked:
+        # encoded length (quotes and escapes included) plus the separator
+        cost = len(json.dumps(blocks[i], ensure_ascii=False, separators=(",", ":"))) + 1
+        if cost <= budget:
+            kept.append(i)
+            budget -= cost
+    return json.dumps([blocks[i] for i in sorted(kept)], ensure_ascii=False, separators=(",", ":"))
+
+
+def _cache_llm_response(key: tuple, response: str):
+    _LLM_RESPONSE_CACHE[key] = response
+    if len(_LLM_RESPONSE_CACHE) > _LLM_RESPONSE_CACHE_SIZE:
+        _LLM_RESPONSE_CACHE.popitem(last=False)
+
 
 class UITester:
 
@@ -39,6 +131,14 @@ class UITester:
         self.current_case_steps: List[Dict[str, Any]] = []
         self.all_cases_data: List[Dict[str, Any]] = []  # Store complete data for all cases
         self.step_counter: int = 0  # Used to generate step ID
+        # Running totals over all_cases_data, updated in finish_case
+        self._case_stats: Dict[str, Any] = {
+            "passed": 0,
+            "failed": 0,
+            "total_steps": 0,
+            "start_time": None,
+            "end_time": None,
+        }
 
     async def initialize(self, browser_session: BrowserSession = None):
         if browser_session:
@@ -85,7 +185,8 @@ class UITester:
         if not self.is_initialized:
             raise RuntimeError("ParallelUITester not initialized")
 
-        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        start_time = _timestamp()
+        marker_screenshot = None
 
         try:
             logging.debug(f"Executing AI instruction: {test_step}")
@@ -94,7 +195,8 @@ class UITester:
             dp = DeepCrawler(self.page)
             prev = await dp.crawl(highlight=True, viewport_only=True, cache_dom=True)
             await self._actions.update_element_buffer(prev.raw_dict())
-            logging.debug(f"previous dom before action : {prev.to_llm_json()}")
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(f"previous dom before action : {prev.to_llm_json()}")
 
             # Take screenshot
             marker_screenshot = await self._actions.b64_page_screenshot(file_name="marker")
@@ -114,14 +216,22 @@ class UITester:
             user_prompt = self._prepare_prompt_action(test_step, prev.to_llm_json(template=planning_template), LLMPrompt.planner_output_prompt)
 
             # Generate plan
-            plan_json = await self._generate_plan(LLMPrompt.planner_system_prompt, user_prompt, marker_screenshot)
+            plan_json, plan_key, plan_text = await self._generate_plan(
+                LLMPrompt.planner_system_prompt, user_prompt, marker_screenshot
+            )
 
             logging.debug(f"Generated plan: {plan_json}")
 
             # Execute plan
             execution_steps, execution_result = await self._execute_plan(test_step, plan_json, file_path)
 
-            end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # Only a plan that worked is worth replaying; a failed one must go back to the LLM on retry
+            if execution_result.get("success"):
+                _cache_llm_response(plan_key, plan_text)
+            else:
+                _LLM_RESPONSE_CACHE.pop(plan_key, None)
+
+            end_time = _timestamp()
 
             curr = await dp.crawl(highlight=True, viewport_only=True, cache_dom=True)
             diff_elems = curr.diff_dict([str(ElementKey.TAG_NAME), str(ElementKey.INNER_TEXT), str(ElementKey.ATTRIBUTES)])
@@ -140,7 +250,7 @@ class UITester:
                 "description": f"action: {test_step}",
                 "actions": execution_steps,  # All actions aggregated together
                 "screenshots": screenshots_list,  # All screenshots aggregated together
-                "modelIO": json.dumps(plan_json, indent=2, ensure_ascii=False) if isinstance(plan_json, dict) else "",
+                "modelIO": _dumps_model_io(plan_json) if isinstance(plan_json, dict) else "",
                 "status": status_str,
                 "start_time": start_time,
                 "end_time": end_time,
@@ -155,14 +265,10 @@ class UITester:
             error_msg = f"AI instruction failed: {str(e)}"
             logging.error(error_msg)
 
-            end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            # Safely get possibly undefined variables
-            safe_marker_screenshot = locals().get("marker_screenshot")
-            safe_plan_json = locals().get("plan_json", {})
+            end_time = _timestamp()
 
             # Build error case execution step dictionary structure
-            error_screenshots = [{"type": "base64", "data": safe_marker_screenshot}] if safe_marker_screenshot else []
+            error_screenshots = [{"type": "base64", "data": marker_screenshot}] if marker_screenshot else []
 
             error_execution_steps = {
                 "description": f"action: {test_step}",
@@ -192,37 +298,48 @@ class UITester:
         if not self.is_initialized:
             raise RuntimeError("ParallelUITester not initialized")
 
-        start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        start_time = _timestamp()
 
         try:
             logging.debug(f"Executing AI assertion: {assertion}")
 
-            # Crawl current page
+            # Crawl current page; clear markers left by a previous action first so they
+            # don't end up in the extracted text
             dp = DeepCrawler(self.page)
+            await dp.remove_marker()
             await dp.crawl(highlight=True, highlight_text=True, viewport_only=True)
 
+            # The element tree is built before highlights are rendered, so the
+            # page structure can come from this same crawl
+            page_structure = _truncate_page_structure(dp.get_text(), assertion)
+
             marker_screenshot = await self._actions.b64_page_screenshot(file_name="marker")
             await dp.remove_marker()
 
             screenshot = await self._actions.b64_page_screenshot(file_name="assert")
 
-            # Get page structure
-            await dp.crawl(highlight=False, highlight_text=True, viewport_only=True)
-            page_structure = dp.get_text()
-
             # Prepare LLM input
             user_prompt = self._prepare_prompt_verify(
                 f"assertion: {assertion}", LLMPrompt.verification_prompt, page_structure
             )
 
-            result = await self.llm.get_llm_response(
-                LLMPrompt.verification_system_prompt, user_prompt, images=[marker_screenshot, screenshot]
-            )
+            # Nothing was highlighted if both captures match; send the image only once
+            images = [marker_screenshot] if screenshot == marker_screenshot else [marker_screenshot, screenshot]
+            cache_key = _llm_cache_key(self.llm.model, LLMPrompt.verification_system_prompt, user_prompt, images)
+            result = _LLM_RESPONSE_CACHE.get(cache_key)
+            if result is not None:
+                _LLM_RESPONSE_CACHE.move_to_end(cache_key)
+                logging.debug("Reusing verification response for an identical page state")
+            else:
+                result = await self.llm.get_llm_response(
+                    LLMPrompt.verification_system_prompt, user_prompt, images=images
+                )
 
             # Process result
             if isinstance(result, str):
                 try:
                     model_output = json.loads(result)
+                    _cache_llm_response(cache_key, result)
                 except json.JSONDecodeError:
                     model_output = {
                         "Validation Result": "Validation Failed",
@@ -239,7 +356,7 @@ class UITester:
             # Determine status
             is_passed = model_output.get("Validation Result") == "Validation Passed"
 
-            end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            end_time = _timestamp()
 
             # Build verification result
             status_str = "passed" if is_passed else "failed"
@@ -273,7 +390,7 @@ class UITester:
             except:
                 basic_screenshot = None
 
-            end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            end_time = _timestamp()
 
             error_step = {
                 "description": f"verify: {assertion}",
@@ -293,33 +410,53 @@ class UITester:
             return error_step, {"Validation Result": "Validation Failed", "Details": error_msg}
 
     def _prepare_prompt_action(self, test_step: str, browser_elements: str, prompt_template: str) -> str:
-        """Prepare LLM prompt."""
+        """Prepare LLM prompt.
+
+        The static template leads so that, together with the system prompt, it
+        forms a prefix shared by every call that provider-side prompt caching can
+        reuse; the per-step text follows and screenshots are appended last.
+        """
         return (
-            f"test step: {test_step}\n"
+            f"{prompt_template}\n"
             f"====================\n"
-            f"pageDescription (interactive elements): {browser_elements}\n"
+            f"test step: {test_step}\n"
             f"====================\n"
-            f"{prompt_template}"
+            f"pageDescription (interactive elements): {browser_elements}"
         )
 
     def _prepare_prompt_verify(self, test_step: str, prompt_template: str, page_structure: str) -> str:
-        """Prepare LLM prompt."""
+        """Prepare LLM prompt (static template first, see
+        _prepare_prompt_action)."""
         return (
-            f"test step: {test_step}\n"
+            f"{prompt_template}\n"
             f"====================\n"
-            f"page_structure (full text content): {page_structure}\n"
+            f"test step: {test_step}\n"
             f"====================\n"
-            f"{prompt_template}"
+            f"page_structure (full text content): {page_structure}"
         )
 
-    async def _generate_plan(self, system_prompt: str, prompt: str, browser_screenshot: str) -> Dict[str, Any]:
-        """Generate test plan."""
+    async def _generate_plan(self, system_prompt: str, prompt: str, browser_screenshot: str) -> Tuple[Dict[str, Any], tuple, str]:
+        """Generate test plan.
+
+        Returns the parsed plan together with its cache key and raw response.
+        The plan is not cached here; the caller stores it once it has executed
+        successfully.
+        """
         max_retries = 2
+        # Keyed on the base prompt so identical page states share entries even
+        # when a retry had to add the strict JSON reminder
+        cache_key = _llm_cache_key(self.llm.model, system_prompt, prompt, browser_screenshot)
+        request_prompt = prompt
 
         for attempt in range(max_retries):
             try:
-                # Get LLM response
-                test_plan = await self.llm.get_llm_response(system_prompt, prompt, images=browser_screenshot)
+                # Get LLM response, reusing the plan for an identical step on an identical page
+                test_plan = _LLM_RESPONSE_CACHE.get(cache_key)
+                if test_plan is not None:
+                    _LLM_RESPONSE_CACHE.move_to_end(cache_key)
+                    logging.debug("Reusing plan for an identical step and page state")
+                else:
+                    test_plan = await self.llm.get_llm_response(system_prompt, request_prompt, images=browser_screenshot)
 
                 # Process API error
                 if isinstance(test_plan, dict) and "error" in test_plan:
@@ -332,20 +469,25 @@ class UITester:
                 try:
                     plan_json = json.loads(test_plan)
                 except json.JSONDecodeError as je:
-                    raise ValueError(f"Invalid JSON response: {str(je)}")
+                    raise PlanFormatError(f"Invalid JSON response: {str(je)}")
 
-                if not plan_json.get("actions"):
+                if not isinstance(plan_json, dict) or not plan_json.get("actions"):
                     logging.error(f"No valid actions found in plan: {test_plan}")
-                    raise ValueError("No valid actions found in plan")
+                    raise PlanFormatError("No valid actions found in plan")
 
-                return plan_json
+                return plan_json, cache_key, test_plan
 
             except (ValueError, json.JSONDecodeError) as e:
                 if attempt == max_retries - 1:
                     raise ValueError(f"Failed to generate valid plan after {max_retries} attempts: {str(e)}")
 
                 logging.warning(f"Plan generation attempt {attempt + 1} failed: {str(e)}, retrying...")
-                await asyncio.sleep(1)
+                if isinstance(e, PlanFormatError):
+                    # The model answered but in the wrong shape: re-ask right away with a stricter instruction
+                    request_prompt = prompt + _STRICT_PLAN_REMINDER
+                else:
+                    # Transport/API failure: give the endpoint a moment before the single retry
+                    await asyncio.sleep(1)
 
     async def _execute_plan(self, user_case: str, plan_json: Dict[str, Any], file_path: str = None) -> Dict[str, Any]:
         """Execute test plan."""
@@ -374,7 +516,7 @@ class UITester:
                 # Wait for page to stabilize
                 try:
                     await self.page.wait_for_load_state("networkidle", timeout=10000)
-                    await asyncio.sleep(1.5)
+                    await asyncio.sleep(0.3 if action.get("type") in _QUIET_ACTIONS else 1.5)
                 except Exception as e:
                     logging.warning(f"Page did not become network idle: {e}")
                     await asyncio.sleep(1)
@@ -460,6 +602,10 @@ class UITester:
             await self.end_session()
         except Exception as e:
             logging.warning(f"UITester.cleanup encountered an error: {e}")
+        try:
+            await self.llm.close()
+        except Exception as e:
+            logging.warning(f"UITester.cleanup failed to close LLM client: {e}")
 
     def set_current_test_name(self, name: str):
         """Set the current test case name (stub for compatibility with
@@ -486,7 +632,7 @@ class UITester:
             "name": formatted_case_name,
             "original_name": case_name,  # Keep original name for reference
             "case_index": case_index,
-            "start_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "start_time": _timestamp(),
             "case_info": case_data or {},
             "steps": [],
             "status": "running",
@@ -512,16 +658,12 @@ class UITester:
         self.step_counter += 1
 
         # Process actions data, remove screenshots
-        original_actions = step_data.get("actions", [])
-        cleaned_actions = []
+        cleaned_actions = [
+            {key: value for key, value in action.items() if key != "screenshot"}
+            for action in step_data.get("actions", [])
+        ]
 
-        for action in original_actions:
-            # Copy action data, but remove screenshot field
-            cleaned_action = {}
-            for key, value in action.items():
-                if key != "screenshot":  # Remove screenshot field
-                    cleaned_action[key] = value
-            cleaned_actions.append(cleaned_action)
+        model_io = step_data.get("modelIO", "")
 
         # Convert to runner format step structure
         formatted_step = {
@@ -529,14 +671,10 @@ class UITester:
             "number": self.step_counter,
             "description": step_data.get("description", ""),
             "screenshots": step_data.get("screenshots", []),
-            "modelIO": (
-                step_data.get("modelIO", "")
-                if isinstance(step_data.get("modelIO", ""), str)
-                else json.dumps(step_data.get("modelIO", ""), ensure_ascii=False)
-            ),
+            "modelIO": model_io if isinstance(model_io, str) else json.dumps(model_io, ensure_ascii=False),
             "actions": cleaned_actions,  # Use cleaned actions
             "status": step_data.get("status", "passed"),
-            "end_time": step_data.get("end_time", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            "end_time": step_data["end_time"] if "end_time" in step_data else _timestamp(),
         }
 
         # If there is error information, add to step
@@ -562,7 +700,7 @@ class UITester:
 
         self.current_case_data.update(
             {
-                "end_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "end_time": _timestamp(),
                 "status": final_status,
                 "final_summary": final_summary or "",
                 "total_steps": steps_count,
@@ -585,8 +723,9 @@ class UITester:
                 f"Steps count mismatch for case '{case_name}': stored={len(stored_steps)}, tracked={steps_count}"
             )
 
-        # Save to all cases data
-        self.all_cases_data.append(self.current_case_data.copy())
+        # Save to all cases data; the dict is handed over as-is since current_case_data is reset below
+        self.all_cases_data.append(self.current_case_data)
+        self._update_case_stats(self.current_case_data)
         logging.debug(
             f"Finished case: '{case_name}' with status: {final_status}, {steps_count} steps, total cases: {len(self.all_cases_data)}"
         )
@@ -596,6 +735,21 @@ class UITester:
         self.current_case_steps = []
         self.step_counter = 0
 
+    def _update_case_stats(self, case: Dict[str, Any]):
+        """Fold a finished case into the running summary totals."""
+        stats = self._case_stats
+        status = case.get("status")
+        if status in ("passed", "failed"):
+            stats[status] += 1
+        stats["total_steps"] += case.get("total_steps", 0)
+        # Timestamps are "%Y-%m-%d %H:%M:%S" strings, which order chronologically
+        start_time = case.get("start_time")
+        if start_time and (stats["start_time"] is None or start_time < stats["start_time"]):
+            stats["start_time"] = start_time
+        end_time = case.get("end_time")
+        if end_time and (stats["end_time"] is None or end_time > stats["end_time"]):
+            stats["end_time"] = end_time
+
     def get_current_case_steps(self) -> List[Dict[str, Any]]:
         """Get all steps data for current case."""
         return self.current_case_steps.copy()
@@ -607,9 +761,9 @@ class UITester:
     def get_case_summary(self) -> Dict[str, Any]:
         """Get summary information for test execution."""
         total_cases = len(self.all_cases_data)
-        passed_cases = sum(1 for case in self.all_cases_data if case.get("status") == "passed")
-        failed_cases = sum(1 for case in self.all_cases_data if case.get("status") == "failed")
-        total_steps = sum(case.get("total_steps", 0) for case in self.all_cases_data)
+        passed_cases = self._case_stats["passed"]
+        failed_cases = self._case_stats["failed"]
+        total_steps = self._case_stats["total_steps"]
 
         return {
             "total_cases": total_cases,
@@ -629,23 +783,21 @@ class UITester:
             logging.warning("No case data available for report generation")
             return {}
 
-        total_steps = 0
-        for i, case in enumerate(self.all_cases_data):
-            case_steps = case.get("steps", [])
-            case_name = case.get("name", f"Case_{i + 1}")  # Use 1-based indexing as fallback
-            total_steps += len(case_steps)
-            logging.debug(
-                f"Report validation - Case '{case_name}': {len(case_steps)} steps, status: {case.get('status', 'unknown')}"
-            )
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            total_steps = 0
+            for i, case in enumerate(self.all_cases_data):
+                case_steps = case.get("steps", [])
+                case_name = case.get("name", f"Case_{i + 1}")  # Use 1-based indexing as fallback
+                total_steps += len(case_steps)
+                logging.debug(
+                    f"Report validation - Case '{case_name}': {len(case_steps)} steps, status: {case.get('status', 'unknown')}"
+                )
 
-        logging.debug(f"Report generation - Total cases: {len(self.all_cases_data)}, Total steps: {total_steps}")
+            logging.debug(f"Report generation - Total cases: {len(self.all_cases_data)}, Total steps: {total_steps}")
 
         # Calculate overall test time
-        start_times = [case.get("start_time") for case in self.all_cases_data if case.get("start_time")]
-        end_times = [case.get("end_time") for case in self.all_cases_data if case.get("end_time")]
-
-        overall_start = min(start_times) if start_times else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        overall_end = max(end_times) if end_times else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        overall_start = self._case_stats["start_time"] or _timestamp()
+        overall_end = self._case_stats["end_time"] or _timestamp()
 
         try:
             start_dt = datetime.strptime(overall_start, "%Y-%m-%d %H:%M:%S")
@@ -655,9 +807,7 @@ class UITester:
             duration = 0.0
 
         # Determine overall status
-        overall_status = "completed"
-        if any(case.get("status") == "failed" for case in self.all_cases_data):
-            overall_status = "failed"
+        overall_status = "failed" if self._case_stats["failed"] else "completed"
 
         summary = self.get_case_summary()
 
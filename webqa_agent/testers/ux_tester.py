@@ -1,11 +1,13 @@
-import ast
 import asyncio
 import base64
+import hashlib
 import json
 import logging
 import uuid
+from collections import OrderedDict
 from io import BytesIO
-from typing import List, Dict, Any, Optional
+from itertools import groupby
+from typing import List, Dict, Any, Optional, Tuple
 
 from html2text import html2text
 from playwright.async_api import Page
@@ -16,7 +18,7 @@ from webqa_agent.crawler.deep_crawler import DeepCrawler
 from webqa_agent.data.test_structures import (SubTestReport, SubTestResult,
                                               SubTestScreenshot, SubTestStep,
                                               TestStatus)
-from webqa_agent.llm.llm_api import LLMAPI
+from webqa_agent.llm.llm_api import LLMAPI, LLMAPIRegistry
 from webqa_agent.llm.prompt import LLMPrompt
 from webqa_agent.utils import Display
 from webqa_agent.utils.log_icon import icon
@@ -28,13 +30,112 @@ try:
 except Exception:
     _PIL_AVAILABLE = False
 
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except Exception:
+    _ORJSON_AVAILABLE = False
+
+# 发送给LLM的页面文本长度上限
+MAX_PAGE_TEXT_CHARS = 16000
+
+# LLM响应缓存，按 (模型, 提示词摘要, 截图摘要) 索引；相同页面内容重复评估时直接复用
+_LLM_RESPONSE_CACHE: OrderedDict[tuple, str] = OrderedDict()
+_LLM_RESPONSE_CACHE_SIZE = 32
+
+# 发送给视觉模型的截图统一转为JPEG以减小上传体积；报告中仍使用原始PNG截图
+_LLM_SCREENSHOT_JPEG_QUALITY = 80
+
+# html2text 转换结果缓存，按HTML内容摘要索引；同一页面/iframe在多次运行中只解析一次
+_HTML_TEXT_CACHE: OrderedDict[bytes, str] = OrderedDict()
+_HTML_TEXT_CACHE_SIZE = 32
+
+
+async def _html_to_text(html_content: str) -> str:
+    """Convert HTML to text with html2text, reusing results for identical
+    HTML.
+
+    The conversion itself runs in a worker thread so large pages don't block
+    the event loop; the cache is only touched from the loop.
+    """
+    key = hashlib.blake2b(html_content.encode(), digest_size=16).digest()
+    text = _HTML_TEXT_CACHE.get(key)
+    if text is not None:
+        _HTML_TEXT_CACHE.move_to_end(key)
+        return text
+    text = await asyncio.to_thread(html2text, html_content)
+    _HTML_TEXT_CACHE[key] = text
+    if len(_HTML_TEXT_CACHE) > _HTML_TEXT_CACHE_SIZE:
+        _HTML_TEXT_CACHE.popitem(last=False)
+    return text
+
+
+def _compress_screenshot(image_b64: str, max_edge: Optional[int] = None) -> Tuple[str, float]:
+    """Re-encode a data-URL screenshot as JPEG for the vision model.
+
+    If ``max_edge`` is given the image is also shrunk to fit it. Returns the
+    new data URL and the applied scale factor, which is needed to map
+    coordinates the model reports back onto the original screenshot. The
+    original is returned unchanged if it cannot be decoded or would not get
+    smaller.
+    """
+    if not (_PIL_AVAILABLE and isinstance(image_b64, str) and image_b64.startswith('data:image')):
+        return image_b64, 1.0
+    try:
+        _, b64 = image_b64.split(',', 1)
+        with Image.open(BytesIO(base64.b64decode(b64))) as im:
+            scale = 1.0
+            if max_edge and max(im.size) > max_edge:
+                scale = max_edge / max(im.size)
+                im = im.resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))))
+            if im.mode != 'RGB':
+                im = im.convert('RGB')
+            out = BytesIO()
+            im.save(out, format='JPEG', quality=_LLM_SCREENSHOT_JPEG_QUALITY)
+        new_b64 = base64.b64encode(out.getvalue()).decode('utf-8')
+        if scale == 1.0 and len(new_b64) >= len(b64):
+            return image_b64, 1.0
+        return f'data:image/jpeg;base64,{new_b64}', scale
+    except Exception as e:
+        logging.debug(f'Screenshot compression skipped: {e}')
+        return image_b64, 1.0
+
+
+async def _cached_llm_response(llm: LLMAPI, system_prompt: str, prompt: str, images=None) -> str:
+    """Call llm.get_llm_response, reusing the answer for an identical model,
+    prompt and screenshot set."""
+    image_list = [images] if isinstance(images, str) else images or []
+    key = (
+        llm.model,
+        hashlib.blake2b(f'{system_prompt}\0{prompt}'.encode(), digest_size=16).digest(),
+        tuple(hashlib.blake2b(str(image).encode(), digest_size=16).digest() for image in image_list),
+    )
+    response = _LLM_RESPONSE_CACHE.get(key)
+    if response is not None:
+        _LLM_RESPONSE_CACHE.move_to_end(key)
+        logging.debug('Reusing LLM response for identical page content')
+        return response
+    response = await llm.get_llm_response(system_prompt, prompt, images=images)
+    if isinstance(response, str) and response.strip():
+        _LLM_RESPONSE_CACHE[key] = response
+        if len(_LLM_RESPONSE_CACHE) > _LLM_RESPONSE_CACHE_SIZE:
+            _LLM_RESPONSE_CACHE.popitem(last=False)
+    return response
+
+
+def _loads_json(text: str):
+    """解析LLM返回的JSON，安装了 orjson 时使用 orjson."""
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
 
 class PageTextTest:
 
     def __init__(self, llm_config: dict, user_cases: List[str] = None, report_config: dict = None):
         self.llm_config = llm_config
         self.user_cases = user_cases or LLMPrompt.TEXT_USER_CASES
-        self.llm = LLMAPI(self.llm_config)
+        self.llm: Optional[LLMAPI] = None
         self.language = report_config["language"] if report_config else "zh-CN"
         self.localized_strings = {
             'zh-CN': i18n.get_lang_data('zh-CN').get('testers', {}).get('ux', {}),
@@ -46,12 +147,11 @@ class PageTextTest:
         return self.localized_strings.get(self.language, {}).get(key, key)
 
     async def get_iframe_content(self, frame):
-        # get iframe content
-        html_content = await frame.content()
-        page_text = html2text(html_content)
-        for child_frame in frame.child_frames:
-            page_text += await self.get_iframe_content(child_frame)
-        return page_text
+        # get iframe content; the frame and its children are fetched concurrently, text keeps frame order
+        html_content, *child_texts = await asyncio.gather(
+            frame.content(), *[self.get_iframe_content(child_frame) for child_frame in frame.child_frames]
+        )
+        return await _html_to_text(html_content) + ''.join(child_texts)
 
     async def run(self, page: Page) -> SubTestResult:
         """Runs a test to check the text content of a web page and identifies
@@ -77,22 +177,25 @@ class PageTextTest:
                 logging.debug('page is not blank, start crawling page content')
 
                 # 获取页面文本内容
-                page_text = html2text(await page.content())
-                for frame in page.frames:
-                    if frame != page.main_frame:
-                        page_text += await self.get_iframe_content(frame)
+                page_html, *frame_texts = await asyncio.gather(
+                    page.content(),
+                    *[self.get_iframe_content(frame) for frame in page.frames if frame != page.main_frame],
+                )
+                page_text = self._normalize_page_text(await _html_to_text(page_html) + ''.join(frame_texts))
 
-                # 运行每个用例
-                for user_case in self.user_cases:
-                    logging.debug(f'page_text: {page_text}')
-                    prompt = self._build_prompt(page_text, user_case)
+                logging.debug(f'page_text: {page_text}')
 
-                    # 确保LLM已初始化
-                    if not hasattr(self.llm, '_client') or self.llm._client is None:
-                        await self.llm.initialize()
+                # 与其他UX测试共用同一配置的LLM客户端
+                self.llm = await LLMAPIRegistry.get(self.llm_config)
 
-                    test_page_content = await self.llm.get_llm_response(LLMPrompt.page_default_prompt, prompt)
+                # 各用例相互独立，并发请求LLM，结果按用例顺序处理
+                responses = await asyncio.gather(*[
+                    _cached_llm_response(self.llm, LLMPrompt.page_default_prompt, self._build_prompt(page_text, user_case))
+                    for user_case in self.user_cases
+                ])
 
+                # 运行每个用例
+                for test_page_content in responses:
                     has_issues = test_page_content and 'None' not in str(test_page_content)
                     if has_issues:
                         result.status = TestStatus.FAILED
@@ -117,6 +220,16 @@ class PageTextTest:
 
             return result
 
+    def _normalize_page_text(self, page_text: str) -> str:
+        """Strip trailing whitespace, collapse adjacent duplicate lines (menus,
+        footers, blank runs) and cap the length sent to the LLM."""
+        lines = [line for line, _ in groupby(line.rstrip() for line in page_text.splitlines())]
+        text = '\n'.join(lines)
+        if len(text) > MAX_PAGE_TEXT_CHARS:
+            text = text[:MAX_PAGE_TEXT_CHARS]
+        logging.debug(f'page_text normalized: {len(page_text)} -> {len(text)} characters')
+        return text
+
     def _build_prompt(self, page_text: str, user_case: str) -> str:
         """Builds the LLM prompt in English."""
         return f"""Task description: Based on the provided web page content and user cases, check for any typos or English grammar errors. If errors are found, output the results in the specified JSON format.
@@ -147,7 +260,7 @@ class PageTextTest:
         try:
             if isinstance(issues_content, str):
                 if issues_content.strip().startswith('{'):
-                    data = json.loads(issues_content)
+                    data = _loads_json(issues_content)
                 else:
                     return issues_content
             else:
@@ -196,7 +309,7 @@ class PageContentTest:
     def __init__(self, llm_config: dict, user_cases: List[str] = None, report_config: dict = None):
         self.llm_config = llm_config
         self.user_cases = user_cases or LLMPrompt.CONTENT_USER_CASES
-        self.llm = LLMAPI(self.llm_config)
+        self.llm: Optional[LLMAPI] = None
         self.language = report_config["language"] if report_config else "zh-CN"
         self.localized_strings = {
             'zh-CN': i18n.get_lang_data('zh-CN').get('testers', {}).get('ux', {}),
@@ -232,8 +345,7 @@ class PageContentTest:
         layout_case = self.user_cases[0]
 
         try:
-            if not hasattr(self.llm, '_client') or self.llm._client is None:
-                await self.llm.initialize()
+            self.llm = await LLMAPIRegistry.get(self.llm_config)
 
             page_identifier = str(int(uuid.uuid4().int) % 10000)
             _scroll = ScrollHandler(page)
@@ -244,9 +356,20 @@ class PageContentTest:
 
             page_img = True
 
+            # 压缩后的截图只用于LLM请求，所有用例共用一份
+            max_edge = self.llm_config.get('screenshot_max_edge')
+            compressed = await asyncio.gather(
+                *(asyncio.to_thread(_compress_screenshot, shot, max_edge) for shot in browser_screenshot)
+            )
+            llm_screenshot = [shot for shot, _ in compressed]
+            screenshot_scales = [scale for _, scale in compressed]
+
             with Display.display(self._get_text('ux_test_display') + self._get_text('layout_case')):
                 # 执行布局检查
-                await self._run_single_test(layout_result, layout_case, id_map, browser_screenshot, page_img)
+                await self._run_single_test(
+                    layout_result, layout_case, id_map, browser_screenshot, page_img,
+                    llm_screenshot=llm_screenshot, screenshot_scales=screenshot_scales
+                )
                 logging.info(f"{icon['check']} Sub Tests Completed: {layout_result.name}")
 
             # with Display.display(_['ux_test_display'] + _['element_check_name']):
@@ -266,15 +389,20 @@ class PageContentTest:
 
         return [layout_result]
 
-    async def _run_single_test(self, result: SubTestResult, user_case: str, id_map: dict, browser_screenshot: List, page_img: bool):
-        """执行单个测试."""
+    async def _run_single_test(self, result: SubTestResult, user_case: str, id_map: dict, browser_screenshot: List, page_img: bool,
+                               llm_screenshot: Optional[List] = None, screenshot_scales: Optional[List[float]] = None):
+        """执行单个测试.
+
+        llm_screenshot 为发送给LLM的截图（默认与 browser_screenshot 相同），
+        screenshot_scales 为其相对原图的缩放比例，用于将返回的坐标还原到原图。
+        """
         id_counter = 0
         overall_status = TestStatus.PASSED
 
         prompt = self._build_prompt(user_case, id_map, len(browser_screenshot))
         logging.debug(f'{result.name} test, prompt: {prompt}')
         logging.info(f"Vision model: evaluating use case '{result.name}'...")
-        test_page_content = await self._get_llm_response(prompt, page_img, browser_screenshot)
+        test_page_content = await self._get_llm_response(prompt, page_img, llm_screenshot or browser_screenshot)
 
         # parse LLM response
         summary_text = None
@@ -286,7 +414,7 @@ class PageContentTest:
 
         if test_page_content and str(test_page_content).strip():
             try:
-                parsed = json.loads(test_page_content)
+                parsed = _loads_json(test_page_content)
                 logging.debug(f'Parsed LLM output: {parsed}')
             except Exception:
                 logging.warning('Unable to parse LLM output as JSON')
@@ -339,7 +467,11 @@ class PageContentTest:
                     c = issue.get('coordinates')
                     if isinstance(c, (list, tuple)) and len(c) == 4:
                         try:
-                            x1, y1, x2, y2 = [int(float(v)) for v in c]
+                            sid = issue.get('screenshotid')
+                            scale = 1.0
+                            if screenshot_scales and isinstance(sid, int) and 0 <= sid < len(screenshot_scales):
+                                scale = screenshot_scales[sid]
+                            x1, y1, x2, y2 = [int(float(v) / scale) for v in c]
                             # ensure ordering and non-negative
                             x1, x2 = sorted([max(0, x1), max(0, x2)])
                             y1, y2 = sorted([max(0, y1), max(0, y2)])
@@ -721,9 +853,10 @@ class PageContentTest:
 
     async def _get_llm_response(self, prompt: str, page_img: bool, browser_screenshot=None):
         if page_img and browser_screenshot:
-            return await self.llm.get_llm_response(
+            return await _cached_llm_response(
+                self.llm,
                 LLMPrompt.page_default_prompt,
                 prompt,
                 images=browser_screenshot,
             )
-        return await self.llm.get_llm_response(LLMPrompt.page_default_prompt, prompt)
+        return await _cached_llm_response(self.llm, LLMPrompt.page_default_prompt, prompt)
@@ -6,8 +6,9 @@ import sys
 import time
 import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from io import StringIO
-from typing import Optional, List
+from typing import Dict, Optional
 from collections import deque
 
 from webqa_agent.utils.get_log import COLORS
@@ -31,21 +32,63 @@ class _Tracker:
     def __enter__(self):
         self.start_time = time.monotonic()
         with self.display_util.lock:
-            self.display_util.running.append(TaskInfo(name=self.name, start=self.start_time))
+            self.display_util.running[id(self)] = TaskInfo(name=self.name, start=self.start_time)
         return self
 
     def __exit__(self, exc_type, exc, tb):
         end_time = time.monotonic()
         error = str(exc) if exc else None
         with self.display_util.lock:
-            self.display_util.running = [t for t in self.display_util.running if t.name != self.name]
+            self.display_util.running.pop(id(self), None)
             self.display_util.completed.append(
                 TaskInfo(name=self.name, start=self.start_time, end=end_time, error=error))
         return False
 
+_ANSI_ESCAPE_RE = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+_LOG_LINE_RE = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+)(\s+)(\w+)(\s+\[.*?]\s+\[.*?]\s+-\s+)(.*)")
+
+
 def remove_ansi_escape_sequences(text):
-    ansi_escape = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
-    return ansi_escape.sub('', text)
+    return _ANSI_ESCAPE_RE.sub('', text)
+
+
+# Matches a console log line as written by ColoredFormatter, colour codes
+# included, so a line needs a single regex pass instead of strip + search.
+_COLORED_LOG_LINE_RE = re.compile(
+    r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+)(\s+)(?:\x1B\[[0-9;]*m)?(\s*)(\w+)(?:\x1B\[0m)?"
+    r"(\s+\[.*?]\s+\[.*?]\s+-\s+)(?:\x1B\[[0-9;]*m)?(.*?)(?:\x1B\[0m)?$"
+)
+
+
+@lru_cache(maxsize=256)
+def _format_log_line(line: str, col: int) -> str:
+    """Fit a captured log line into ``col`` terminal columns.
+
+    Cached because the same tail lines are redrawn every refresh.
+    """
+    match = _COLORED_LOG_LINE_RE.search(line)
+    if match and '\x1b' not in match.group(6):
+        timestamp, space1, pad, loglevel, middle, message = match.groups()
+        space1 += pad
+        prefix_len = len(timestamp) + len(space1) + len(loglevel) + len(middle)
+        if prefix_len + len(message) < col:
+            return line
+        if prefix_len < col - 3 and loglevel in COLORS:
+            color = COLORS[loglevel]
+            end = COLORS['ENDC']
+            message = message[:col - 3 - prefix_len]
+            return f"{timestamp}{space1}{color}{loglevel}{end}{middle}{color}{message}{end}..."
+
+    _line = remove_ansi_escape_sequences(line)
+    if len(_line) < col:
+        return line
+    match = _LOG_LINE_RE.search(_line[:col - 3])
+    if match:
+        timestamp, space1, loglevel, middle, message = match.groups()
+        color = COLORS[loglevel]
+        end = COLORS['ENDC']
+        return f"{timestamp}{space1}{color}{loglevel}{end}{middle}{color}{message}{end}..."
+    return f"{_line[:col - 3]}..."
 
 
 class Display:
@@ -62,7 +105,8 @@ class _Display:
     def __init__(self, refresh_interval: float = 0.1, language: str = 'zh-CN'):
         self.logger = logging.getLogger()
         self.logger_handlers = []
-        self.running: List[TaskInfo] = []
+        # keyed by tracker id so that tasks sharing a name are tracked separately
+        self.running: Dict[int, TaskInfo] = {}
         self.completed: deque[TaskInfo] = deque(maxlen=50)
         self._lock = threading.Lock()
         self._interval = refresh_interval
@@ -70,8 +114,11 @@ class _Display:
         self._render_task: Optional[asyncio.Task] = None
         self._spinner_index = 0
         self.captured_output = StringIO()
-        self._log_queue = deque(maxlen=1000)
+        self._last_pos = 0
+        self._frame_count = 0
+        self._cols: Optional[int] = None
         self.num_log = 5  # TODO: Make it configurable
+        self._recent_lines: deque[str] = deque(maxlen=max(self.num_log, 16))
         self.language = language
         self.localized_strings = {
             "zh-CN": i18n.get_lang_data('zh-CN').get('display', {}),
@@ -83,8 +130,6 @@ class _Display:
                 hdr.setStream(self.captured_output)
                 self.logger_handlers.append(hdr)
 
-        self.log_pattern = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+)(\s+)(\w+)(\s+\[.*?]\s+\[.*?]\s+-\s+)(.*)")
-
     def _get_text(self, key: str) -> str:
         """Get localized text for the given key."""
         return self.localized_strings.get(self.language, {}).get(key, key)
@@ -109,55 +154,73 @@ class _Display:
             await asyncio.sleep(self._interval)
         self._render_frame()
 
-    def _render_frame(self):
+    def _read_new_output(self):
+        """Append lines logged since the last frame to ``_recent_lines``.
+
+        Only the unread tail of ``captured_output`` is read, and the buffer is
+        emptied every 1000 frames so it does not grow for the whole run. The
+        handler locks are held so that no record is written while the shared
+        StringIO position is moved.
+        """
+        for hdr in self.logger_handlers:
+            hdr.acquire()
         try:
-            col, lin = os.get_terminal_size()
-        except OSError:
-            col = 180  # TODO: Make it configurable
-        _log = self.captured_output.getvalue()
-        lines = []
-        if _log:
-            lines = _log.splitlines()
+            self.captured_output.seek(self._last_pos)
+            new = self.captured_output.read()
+            self._last_pos = self.captured_output.tell()
+            self._frame_count += 1
+            if self._frame_count % 1000 == 0:
+                self.captured_output.seek(0)
+                self.captured_output.truncate()
+                self._last_pos = 0
+        finally:
+            for hdr in reversed(self.logger_handlers):
+                hdr.release()
+        if new:
+            self._recent_lines.extend(new.splitlines())
+
+    def _terminal_columns(self) -> int:
+        """Terminal width, re-queried every 20 frames since resizes are rare."""
+        if self._cols is None or self._frame_count % 20 == 0:
+            try:
+                self._cols = os.get_terminal_size().columns
+            except OSError:
+                self._cols = 180  # TODO: Make it configurable
+        return self._cols
+
+    def _render_frame(self):
+        self._read_new_output()
+        col = self._terminal_columns()
+        lines = list(self._recent_lines)[-self.num_log:]
         self._spinner_index = (self._spinner_index + 1) % len(self.SPINNER)
         spinner = self.SPINNER[self._spinner_index]
-        out = sys.stdout
-        out.write("\x1b[H\x1b[J")
+        # 锁内只做快照，格式化与输出放到锁外，减少与 _Tracker 的竞争
         with self._lock:
-            out.write(self._get_text("completed_tasks") + "\n")
-            for t in self.completed:
-                if t.end is None:
-                    continue
-                duration = t.end - t.start
-                status = "✅" if t.error is None else "❌"
-                err = f" ⚠️ {t.error}" if t.error else ""
-                out.write(f"  {status} {t.name} ⏱️ {duration:.2f}s{err}\n")
-
-            out.write("════════════════════════════════════════\n")
-
-            out.write(self._get_text("running_tasks") + "\n")
-            now = time.monotonic()
-            for t in self.running:
-                elapsed = now - t.start
-                out.write(f"  ⏳ {spinner} {t.name} [{elapsed:.2f}s]\n")
-            out.write("-" * col + "\n")
-            length = min(self.num_log, len(lines))
-            for ln in range(length):
-                line = lines[-length + ln]
-                _line = remove_ansi_escape_sequences(str(line))
-                if len(_line) >= col:
-                    match = self.log_pattern.search(_line[:col - 3])
-                    if match:
-                        timestamp, space1, loglevel, middle, message = match.groups()
-                        color = COLORS[loglevel]
-                        end = COLORS['ENDC']
-                        colored_loglevel = f"{color}{loglevel}{end}"
-                        colored_message = f"{color}{message}{end}"
-                        _line = f"{timestamp}{space1}{colored_loglevel}{middle}{colored_message}"
-                        out.write(f"{_line}" + "...\n")
-                    else:
-                        out.write(f"{_line[:col-3]}"+"...\n")
-                else:
-                    out.write(line + "\n")
+            completed = list(self.completed)
+            running = list(self.running.values())
+
+        parts = ["\x1b[H\x1b[J", self._get_text("completed_tasks") + "\n"]
+        for t in completed:
+            if t.end is None:
+                continue
+            duration = t.end - t.start
+            status = "✅" if t.error is None else "❌"
+            err = f" ⚠️ {t.error}" if t.error else ""
+            parts.append(f"  {status} {t.name} ⏱️ {duration:.2f}s{err}\n")
+
+        parts.append("════════════════════════════════════════\n")
+
+        parts.append(self._get_text("running_tasks") + "\n")
+        now = time.monotonic()
+        for t in running:
+            elapsed = now - t.start
+            parts.append(f"  ⏳ {spinner} {t.name} [{elapsed:.2f}s]\n")
+        parts.append("-" * col + "\n")
+        for line in lines:
+            parts.append(_format_log_line(str(line), col) + "\n")
+
+        out = sys.stdout
+        out.write("".join(parts))
         out.flush()
 
     def render_summary(self):